@@ -0,0 +1,147 @@
+"""Benchmark the API routes in-process through the ASGI app.
+
+Builds a synthetic database in a temp file, then drives the FastAPI app over
+httpx's ASGI transport (no network, no server) and prints one JSON object with
+throughput and p50/p99 latency per operation. The database path is read when
+`database` is imported, so run.py starts one process per dataset size.
+
+    python benchmarks/bench_api.py --size 100k --iterations 500 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import parse_size, populate
+
+# Operations in the order they run; create comes first so stop has in-progress tasks to stop
+OPERATIONS = ["create", "stop", "list", "today", "stats", "search", "settings_get", "settings_update", "bootstrap"]
+WARMUP = 5
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    index = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+def request_for(operation: str, i: int, created: list):
+    """Method, path and JSON body of the i-th request of an operation"""
+    if operation == "create":
+        return "POST", "/tasks/", {"title": f"Benchmark task {i}", "category": "Work", "tags": ["bench"]}
+    if operation == "stop":
+        return "POST", f"/tasks/{created[i % len(created)]}/stop", None
+    if operation == "list":
+        return "GET", "/tasks/?limit=100", None
+    if operation == "today":
+        return "GET", "/tasks/today", None
+    if operation == "stats":
+        return "GET", "/tasks/stats/summary", None
+    if operation == "search":
+        return "GET", "/tasks/search?q=report&limit=20", None
+    if operation == "settings_get":
+        return "GET", "/settings/", None
+    if operation == "settings_update":
+        return "POST", "/settings/", {"key": "benchmark", "value": str(i)}
+    if operation == "bootstrap":
+        return "GET", "/bootstrap", None
+    raise ValueError(f"Unknown operation: {operation}")
+
+
+async def measure(client, operation: str, iterations: int, concurrency: int, created: list) -> dict:
+    """Run `iterations` requests over `concurrency` workers and summarize their latencies"""
+    for i in range(WARMUP):
+        method, path, body = request_for(operation, iterations + i, created)
+        await client.request(method, path, json=body)
+
+    latencies = []
+    counter = iter(range(iterations))
+
+    async def worker():
+        for i in counter:
+            method, path, body = request_for(operation, i, created)
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise RuntimeError(f"{operation}: {method} {path} returned {response.status_code}: {response.text}")
+            if operation == "create":
+                created.append(response.json()["id"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "throughput": round(len(latencies) / elapsed, 1),  # requests/s
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def run(args) -> dict:
+    import httpx
+    import database
+    import models  # noqa: F401 (registers the tables with database.Base)
+
+    started = time.perf_counter()
+    database.init_db()
+    populate(database.engine, parse_size(args.size), args.users)
+    setup_seconds = time.perf_counter() - started
+
+    import main
+    await main.startup_event()
+
+    results = {}
+    created = []
+    transport = httpx.ASGITransport(app=main.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for operation in args.operations:
+                results[operation] = await measure(client, operation, args.iterations, args.concurrency, created)
+    finally:
+        await main.shutdown_event()
+
+    return {
+        "rows": parse_size(args.size),
+        "users": args.users,
+        "setup_seconds": round(setup_seconds, 2),
+        "operations": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="1k", help="tasks in the dataset: 1k, 100k, 1m or a number")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=200, help="requests per operation")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight at once")
+    parser.add_argument("--operations", default=",".join(OPERATIONS), help="comma-separated subset to run")
+    args = parser.parse_args()
+    args.operations = [operation for operation in args.operations.split(",") if operation]
+    unknown = set(args.operations) - set(OPERATIONS)
+    if unknown:
+        parser.error(f"unknown operations: {', '.join(sorted(unknown))}")
+    args.operations.sort(key=OPERATIONS.index)
+    if "stop" in args.operations and "create" not in args.operations:
+        parser.error("stop needs create to run first")
+
+    # Point the app at a throwaway database before anything imports `database`
+    with tempfile.TemporaryDirectory(prefix="trak-bench-") as tmp:
+        os.environ["TRAK_DATABASE_PATH"] = os.path.join(tmp, "trak.db")
+        os.environ["TRAK_PERSIST_SESSIONS"] = "0"
+        result = asyncio.run(run(args))
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark SQLite concurrency under each storage profile.
+
+Runs a mixed workload (aggregate reads against single-row inserts) from
+several threads on a temp database per profile in database.STORAGE_PROFILES,
+and prints one JSON object with reads, writes and lock errors per second.
+
+    python benchmarks/bench_storage.py --duration 5 --readers 4 --writers 2
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+import database
+
+SEED_ROWS = 20_000
+
+
+def run_profile(profile: str, duration: float, readers: int, writers: int) -> dict:
+    """Counts per second of one profile's mixed read/write workload"""
+    with tempfile.TemporaryDirectory(prefix="trak-bench-") as tmp:
+        engine = database.create_db_engine(f"sqlite:///{os.path.join(tmp, 'storage.db')}", profile)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE samples (id INTEGER PRIMARY KEY, value TEXT, duration FLOAT)"))
+            conn.execute(text("""
+                WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :count)
+                INSERT INTO samples (value, duration) SELECT 'seed', n % 240 FROM seq
+            """), {"count": SEED_ROWS})
+
+        counts = {"reads": 0, "writes": 0, "errors": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def count(key: str):
+            with lock:
+                counts[key] += 1
+
+        def reader():
+            while time.perf_counter() < deadline:
+                try:
+                    with engine.connect() as conn:
+                        conn.execute(text("SELECT COUNT(*), SUM(duration) FROM samples")).all()
+                    count("reads")
+                except OperationalError:
+                    count("errors")
+
+        def writer():
+            while time.perf_counter() < deadline:
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(text("INSERT INTO samples (value, duration) VALUES ('bench', 1.0)"))
+                    count("writes")
+                except OperationalError:
+                    count("errors")
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads += [threading.Thread(target=writer) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    return {f"{key}_per_second": round(value / duration, 1) for key, value in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per profile")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--profiles", default=",".join(database.STORAGE_PROFILES), help="comma-separated subset to run")
+    args = parser.parse_args()
+
+    results = {
+        profile: run_profile(profile, args.duration, args.readers, args.writers)
+        for profile in args.profiles.split(",") if profile
+    }
+    print(json.dumps({
+        "duration": args.duration,
+        "readers": args.readers,
+        "writers": args.writers,
+        "profiles": results,
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Run the benchmark suite and write (or compare against) a JSON baseline.
+
+Each dataset size runs bench_api.py in its own process, followed by
+bench_storage.py once. Metrics are flattened to "api.100k.list.p50_ms"-style
+keys when comparing, and any that got worse than --threshold percent are
+reported and make the run exit with status 1.
+
+    python benchmarks/run.py --output baseline.json
+    python benchmarks/run.py --sizes 1k,100k,1m --compare baseline.json --output current.json
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_script(script: str, args: list, env: dict) -> dict:
+    """Run a benchmark script and parse the JSON on its last line of output"""
+    result = subprocess.run(
+        [sys.executable, os.path.join(BENCH_DIR, script), *args],
+        env=env, stdout=subprocess.PIPE, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    """Numeric leaves of the results keyed by their dotted path"""
+    metrics = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            metrics.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[f"{prefix}{key}"] = value
+    return metrics
+
+
+def lower_is_better(metric: str) -> bool:
+    return metric.endswith("_ms") or metric.endswith("errors_per_second")
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """(metric, old, new, change %) for every throughput or latency metric that regressed"""
+    old = flatten({"api": baseline.get("api", {}), "storage": baseline.get("storage", {}).get("profiles", {})})
+    new = flatten({"api": current.get("api", {}), "storage": current.get("storage", {}).get("profiles", {})})
+    regressions = []
+    for metric, value in sorted(new.items()):
+        if not (metric.endswith("_ms") or metric.endswith("throughput") or metric.endswith("_per_second")):
+            continue
+        if metric not in old or old[metric] == 0:
+            continue
+        change = (value - old[metric]) / old[metric] * 100
+        worse = change if lower_is_better(metric) else -change
+        if worse > threshold:
+            regressions.append((metric, old[metric], value, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1k,100k", help="comma-separated dataset sizes (1k, 100k, 1m or a number)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=200, help="requests per operation")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight at once")
+    parser.add_argument("--operations", help="comma-separated subset of API operations")
+    parser.add_argument("--async-db", action="store_true", help="serve routes from the asyncio engine (TRAK_ASYNC_DB)")
+    parser.add_argument("--profile", help="storage profile for the API runs (TRAK_STORAGE_PROFILE)")
+    parser.add_argument("--storage-duration", type=float, default=5.0, help="seconds per storage profile, 0 to skip")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare the results against")
+    parser.add_argument("--threshold", type=float, default=20.0, help="percent change that counts as a regression")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.async_db:
+        env["TRAK_ASYNC_DB"] = "1"
+    if args.profile:
+        env["TRAK_STORAGE_PROFILE"] = args.profile
+
+    api_args = ["--users", str(args.users), "--iterations", str(args.iterations), "--concurrency", str(args.concurrency)]
+    if args.operations:
+        api_args += ["--operations", args.operations]
+
+    results = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "settings": {
+            "users": args.users,
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "async_db": args.async_db,
+            "profile": args.profile or env.get("TRAK_STORAGE_PROFILE", "default"),
+        },
+        "api": {},
+    }
+    for size in args.sizes.split(","):
+        print(f"[Bench] API with {size} tasks...", file=sys.stderr)
+        results["api"][size] = run_script("bench_api.py", ["--size", size, *api_args], env)
+    if args.storage_duration > 0:
+        print("[Bench] Storage profiles...", file=sys.stderr)
+        results["storage"] = run_script("bench_storage.py", ["--duration", str(args.storage_duration)], env)
+
+    for size, result in results["api"].items():
+        print(f"\n{size} tasks ({result['setup_seconds']}s setup)")
+        print(f"  {'operation':<16}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for operation, stats in result["operations"].items():
+            print(f"  {operation:<16}{stats['throughput']:>10}{stats['p50_ms']:>10}{stats['p99_ms']:>10}")
+    if "storage" in results:
+        print(f"\nstorage ({args.storage_duration}s per profile)")
+        print(f"  {'profile':<16}{'reads/s':>10}{'writes/s':>10}{'errors/s':>10}")
+        for profile, stats in results["storage"]["profiles"].items():
+            print(f"  {profile:<16}{stats['reads_per_second']:>10}{stats['writes_per_second']:>10}{stats['errors_per_second']:>10}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold}% against {args.compare}:")
+            for metric, old, new, change in regressions:
+                print(f"  {metric}: {old} -> {new} ({change:+.1f}%)")
+            sys.exit(1)
+        print(f"\nNo regressions over {args.threshold}% against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
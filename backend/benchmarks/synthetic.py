@@ -0,0 +1,70 @@
+"""Reproducible synthetic datasets for the benchmarks.
+
+Rows are derived from their sequence number rather than a random generator,
+so every run of a given size produces the same database.
+"""
+from datetime import datetime
+
+from sqlalchemy import text
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DAYS = 730  # history spread over the last two years
+
+TASKS_SQL = text("""
+    WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :count)
+    INSERT INTO tasks (user_id, title, description, category, start_time, end_time, duration, status, tags, created_at, updated_at)
+    SELECT
+        1 + n % :users,
+        'Task ' || n || ' ' || CASE n % 4 WHEN 0 THEN 'review pull request' WHEN 1 THEN 'write report'
+                                          WHEN 2 THEN 'team sync' ELSE 'fix login bug' END,
+        CASE WHEN n % 3 = 0 THEN 'Synthetic description for task ' || n END,
+        CASE n % 6 WHEN 0 THEN 'Work' WHEN 1 THEN 'Meeting' WHEN 2 THEN 'Learning'
+                   WHEN 3 THEN 'Break' WHEN 4 THEN 'Personal' END,
+        start_time,
+        CASE WHEN n % 50 != 0 THEN datetime(start_time, '+' || duration || ' minutes') || '.000000' END,
+        CASE WHEN n % 50 != 0 THEN duration ELSE 0.0 END,
+        CASE WHEN n % 50 != 0 THEN 'completed' ELSE 'in_progress' END,
+        CASE n % 4 WHEN 0 THEN 'focus,deep-work' WHEN 1 THEN 'email' END,
+        start_time,
+        start_time
+    FROM (
+        SELECT n,
+               datetime(:now, '-' || (n * 7919 % (:days * 86400)) || ' seconds') || '.000000' AS start_time,
+               (n * 37 % 240) + 0.5 AS duration
+        FROM seq
+    )
+""")
+
+TASK_TAGS_SQL = text("""
+    INSERT INTO task_tags (task_id, tag)
+    SELECT id, 'focus' FROM tasks WHERE tags = 'focus,deep-work'
+    UNION ALL SELECT id, 'deep-work' FROM tasks WHERE tags = 'focus,deep-work'
+    UNION ALL SELECT id, 'email' FROM tasks WHERE tags = 'email'
+""")
+
+
+def parse_size(size: str) -> int:
+    """Accept a named size (1k, 100k, 1m) or a plain row count"""
+    return SIZES.get(size.lower()) or int(size)
+
+
+def populate(engine, count: int, users: int = 50):
+    """Fill an initialized, empty database with `users` users and `count` tasks,
+    plus the derived task_tags, daily_rollups and search index rows"""
+    import database
+    
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO users (username, password_hash, created_at) VALUES (:username, 'x', :now)"),
+            [{"username": f"user{i}", "now": datetime.utcnow()} for i in range(1, users + 1)],
+        )
+        # Anchor "now" to the start of the hour so reruns within it match exactly
+        now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        conn.execute(TASKS_SQL, {"count": count, "users": users, "days": DAYS, "now": now.isoformat(sep=" ")})
+    
+    with engine.begin() as conn:
+        # Same result as database.migrate_task_tags(), without loading every row into Python
+        conn.execute(TASK_TAGS_SQL)
+    database.rebuild_rollups()
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
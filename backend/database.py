@@ -1,23 +1,125 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 
 # Get the backend directory path
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATABASE_PATH = os.path.join(BASE_DIR, "trak.db")
+# TRAK_DATABASE_PATH points the app at another database file (e.g. for benchmarks);
+# the LLM cache and session files live next to it
+DATABASE_PATH = os.environ.get("TRAK_DATABASE_PATH", os.path.join(BASE_DIR, "trak.db"))
+DATA_DIR = os.path.dirname(os.path.abspath(DATABASE_PATH))
 
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
 
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False},
-    echo=False  # Set to True for SQL debugging
-)
+# Serve the task and settings routes from an asyncio engine (requires aiosqlite)
+USE_ASYNC_DB = os.environ.get("TRAK_ASYNC_DB", "").lower() in ("1", "true", "yes")
+
+# SQLite storage profiles, selected with the TRAK_STORAGE_PROFILE env var.
+# "default" uses WAL so readers never block on the writer (and vice versa),
+# "durable" keeps WAL but fsyncs on every commit, and "legacy" restores the
+# SQLite defaults (rollback journal, synchronous=FULL, no busy timeout).
+STORAGE_PROFILES = {
+    "default": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,  # 256 MB
+        "cache_size": -64000,  # 64 MB (negative values are KiB)
+        "busy_timeout": 5000,  # ms
+        "temp_store": "MEMORY",
+        "pool_size": 5,
+        "max_overflow": 10,
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000,
+        "busy_timeout": 5000,
+        "temp_store": "MEMORY",
+        "pool_size": 5,
+        "max_overflow": 10,
+    },
+    "legacy": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "mmap_size": 0,
+        "cache_size": -2000,
+        "busy_timeout": 0,
+        "temp_store": "DEFAULT",
+        "pool_size": 5,
+        "max_overflow": 10,
+    },
+}
+
+STORAGE_PROFILE = os.environ.get("TRAK_STORAGE_PROFILE", "default")
+
+PRAGMAS = ("journal_mode", "synchronous", "mmap_size", "cache_size", "busy_timeout", "temp_store")
+
+
+def apply_storage_profile(db_engine, settings: dict):
+    """Set the profile's pragmas on every new connection of a (sync) engine"""
+    @event.listens_for(db_engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}={settings[pragma]}")
+        cursor.close()
+
+
+def create_db_engine(url: str = DATABASE_URL, profile: str = STORAGE_PROFILE):
+    """Create a SQLite engine with the given storage profile applied to every connection"""
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile: {profile}")
+    settings = STORAGE_PROFILES[profile]
+
+    db_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        pool_size=settings["pool_size"],
+        max_overflow=settings["max_overflow"],
+        echo=False  # Set to True for SQL debugging
+    )
+    apply_storage_profile(db_engine, settings)
+    return db_engine
+
+
+def create_async_db_engine(url: str = ASYNC_DATABASE_URL, profile: str = STORAGE_PROFILE):
+    """Create an asyncio (aiosqlite) engine with the given storage profile"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile: {profile}")
+    settings = STORAGE_PROFILES[profile]
+
+    # aiosqlite defaults to NullPool; keep connections (and their pragmas) around instead
+    db_engine = create_async_engine(
+        url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings["pool_size"],
+        max_overflow=settings["max_overflow"],
+        echo=False
+    )
+    apply_storage_profile(db_engine.sync_engine, settings)
+    return db_engine
+
+
+engine = create_db_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Async engine and sessions are only created when enabled, since aiosqlite is optional
+async_engine = None
+AsyncSessionLocal = None
+if USE_ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine = create_async_db_engine()
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
 # Dependency to get DB session
 def get_db():
     db = SessionLocal()
@@ -26,7 +128,116 @@ def get_db():
     finally:
         db.close()
 
+# Run the session's following queries in one explicit read transaction, so they see a single snapshot
+def begin_read(db):
+    db.connection().exec_driver_sql("BEGIN")
+
+# Dependency to get an async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Per-category stats read daily_rollups now instead of this covering index on tasks,
+# and cached summary keys are unique (ux_sessions_summary_key) rather than just indexed
+OBSOLETE_INDEXES = ["ix_tasks_category_duration", "ix_sessions_summary_key"]
+
+# Bring existing databases up to date with the current models
+def migrate_db():
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        # Older trak.db files predate some columns (e.g. tasks.user_id); add them as nullable
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+    # Keep only the newest of any duplicate cached summaries before their key becomes unique
+    if inspector.has_table("sessions") and "ux_sessions_summary_key" not in {
+        index["name"] for index in inspector.get_indexes("sessions")
+    }:
+        with engine.begin() as conn:
+            conn.execute(text(
+                "DELETE FROM sessions WHERE summary_key IS NOT NULL AND id NOT IN "
+                "(SELECT max(id) FROM sessions WHERE summary_key IS NOT NULL GROUP BY summary_key)"
+            ))
+    
+    # create_all() skips tables that already exist, so add any missing indexes explicitly
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    # Indexes nothing reads any more, but every write would still maintain
+    with engine.begin() as conn:
+        for index_name in OBSOLETE_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+
+
+# Full-text index over task titles, descriptions and tags, kept in sync by triggers
+SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, tags,
+        content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description, tags) VALUES (new.id, new.title, new.description, new.tags);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description, tags) VALUES ('delete', old.id, old.title, old.description, old.tags);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description, tags ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description, tags) VALUES ('delete', old.id, old.title, old.description, old.tags);
+        INSERT INTO tasks_fts(rowid, title, description, tags) VALUES (new.id, new.title, new.description, new.tags);
+    END""",
+]
+
+
+def create_search_index():
+    has_index = inspect(engine).has_table("tasks_fts")
+    with engine.begin() as conn:
+        for statement in SEARCH_DDL:
+            conn.execute(text(statement))
+        if not has_index:
+            # Index the tasks that predate the search table
+            conn.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+
+
 # Initialize database
 def init_db():
+    # Databases from before the rollups and task_tags need them filled once from tasks
+    existing = set(inspect(engine).get_table_names())
     Base.metadata.create_all(bind=engine)
+    migrate_db()
+    create_search_index()
+    if "tasks" in existing and "task_tags" not in existing:
+        migrate_task_tags()
+    if "tasks" in existing and not {"daily_rollups", "tag_rollups"} <= existing:
+        rebuild_rollups()
+
+
+# Copy the comma-separated tasks.tags column into task_tags
+def migrate_task_tags():
+    from utils.rollups import normalize_tags
+    with engine.begin() as conn:
+        rows = conn.execute(text("SELECT id, tags FROM tasks WHERE tags IS NOT NULL AND tags != ''"))
+        tag_rows = [
+            {"task_id": task_id, "tag": tag}
+            for task_id, tags in rows
+            for tag in normalize_tags(tags)
+        ]
+        if tag_rows:
+            conn.execute(text("INSERT OR IGNORE INTO task_tags (task_id, tag) VALUES (:task_id, :tag)"), tag_rows)
+
+
+# Recompute the daily and tag rollups from scratch (also: python main.py rebuild-rollups)
+def rebuild_rollups():
+    from utils.rollups import rebuild_rollups as rebuild
+    db = SessionLocal()
+    try:
+        rebuild(db)
+    finally:
+        db.close()
 
@@ -7,8 +7,14 @@ import os
 # Add current directory to path
 sys.path.append(os.path.dirname(__file__))
 
-from database import init_db
-from routes import tasks, settings, ai, auth
+import database
+from database import init_db, USE_ASYNC_DB
+from routes import tasks, settings, ai, auth, events, bootstrap
+from routes.settings import settings_cache
+
+if USE_ASYNC_DB:
+    # Serve task and settings routes from the asyncio engine instead
+    from routes import tasks_async as tasks, settings_async as settings, bootstrap_async as bootstrap
 
 app = FastAPI(
     title="Trak API",
@@ -28,6 +34,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Initialize database on startup
@@ -35,13 +42,22 @@ app.add_middleware(
 async def startup_event():
     print("Initializing database...")
     init_db()
+    settings_cache.load()
     print("Database initialized successfully!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await ai.ollama.aclose()
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
 # Include routers
 app.include_router(tasks.router)
 app.include_router(settings.router)
 app.include_router(ai.router)
 app.include_router(auth.router)
+app.include_router(events.router)
+app.include_router(bootstrap.router)
 
 @app.get("/")
 async def root():
@@ -53,6 +69,8 @@ async def root():
             "tasks": "/tasks",
             "settings": "/settings",
             "ai": "/ai",
+            "events": "/events",
+            "bootstrap": "/bootstrap",
             "docs": "/docs"
         }
     }
@@ -66,6 +84,11 @@ async def health_check():
     }
 
 if __name__ == "__main__":
+    if sys.argv[1:] == ["rebuild-rollups"]:
+        init_db()
+        database.rebuild_rollups()
+        print("Daily and tag rollups rebuilt")
+        sys.exit(0)
     print("Starting FastAPI server on http://127.0.0.1:8765")
     uvicorn.run(app, host="127.0.0.1", port=8765, log_level="info")
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, Text, ForeignKey, Index
 from datetime import datetime
 from database import Base
 
@@ -33,10 +33,19 @@ class Task(Base):
     end_time = Column(DateTime, nullable=True)
     duration = Column(Float, default=0.0)  # Duration in minutes
     status = Column(String, default="in_progress")  # in_progress, completed, paused
-    tags = Column(String, nullable=True)  # Comma-separated tags
+    tags = Column(String, nullable=True)  # Comma-separated tags, mirrored row-per-tag in task_tags
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Listing, today's tasks and per-day stats filter/sort on start_time
+        Index("ix_tasks_start_time", "start_time"),
+        # Status-filtered listing, ordered by start_time
+        Index("ix_tasks_status_start_time", "status", "start_time"),
+        # Per-user listing, newest first
+        Index("ix_tasks_user_id_start_time", "user_id", start_time.desc()),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -70,6 +79,39 @@ class Settings(Base):
         }
 
 
+class TaskTag(Base):
+    """One row per (task, tag), so tag filters and counts are index lookups"""
+    __tablename__ = "task_tags"
+
+    task_id = Column(Integer, ForeignKey("tasks.id"), primary_key=True)
+    tag = Column(String, primary_key=True)
+
+    __table_args__ = (
+        # Tasks with a given tag (covering, so filters never touch the table)
+        Index("ix_task_tags_tag_task_id", "tag", "task_id"),
+    )
+
+
+class DailyRollup(Base):
+    """Per-day task counts and tracked minutes, kept in step with tasks by utils.rollups"""
+    __tablename__ = "daily_rollups"
+
+    day = Column(String, primary_key=True)  # YYYY-MM-DD of start_time
+    category = Column(String, primary_key=True, default="")  # "" for uncategorized
+    status = Column(String, primary_key=True, default="")
+    tasks_count = Column(Integer, nullable=False, default=0)
+    total_time = Column(Float, nullable=False, default=0.0)  # Total time in minutes
+
+
+class TagRollup(Base):
+    """Per-tag task counts and tracked minutes, kept in step with tasks by utils.rollups"""
+    __tablename__ = "tag_rollups"
+
+    tag = Column(String, primary_key=True)
+    tasks_count = Column(Integer, nullable=False, default=0)
+    total_time = Column(Float, nullable=False, default=0.0)  # Total time in minutes
+
+
 class Session(Base):
     __tablename__ = "sessions"
 
@@ -78,8 +120,14 @@ class Session(Base):
     total_time = Column(Float, default=0.0)  # Total time in minutes
     tasks_count = Column(Integer, default=0)
     summary = Column(Text, nullable=True)  # AI-generated summary
+    summary_key = Column(String, nullable=True)  # content address of the summarized chunk
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # One cached summary per chunk key, so concurrent summaries upsert instead of duplicating
+        Index("ux_sessions_summary_key", "summary_key", unique=True),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -87,6 +135,7 @@ class Session(Base):
             "total_time": self.total_time,
             "tasks_count": self.tasks_count,
             "summary": self.summary,
+            "summary_key": self.summary_key,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
 
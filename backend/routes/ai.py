@@ -1,86 +1,135 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
 from typing import Optional, List, Dict
+from collections import Counter, OrderedDict
 import sys
 import os
-import requests
+import asyncio
+import httpx
 import json
+import secrets
+from datetime import datetime
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils.ollama_client import (
-    check_ollama_available,
-    get_ollama_models,
-    generate_task_title,
-    generate_task_summary,
-    generate_category_suggestion,
-    generate_enhanced_description
-)
+from database import DATA_DIR, get_db
+from models import Task, Session as WorkSession
+from routes.settings import get_setting_value
+from routes.tasks import get_totals
+from utils.category_classifier import CategoryClassifier
+from utils.llm_cache import LLMCache
+from utils.ollama_client import OllamaClient, VALID_CATEGORIES, category_text, coalesce_tokens
+from utils import summarizer
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
+# One client (and keep-alive connection pool) per process, with generated
+# titles/descriptions/categories cached in llm_cache.db next to trak.db
+llm_cache = LLMCache(os.path.join(DATA_DIR, "llm_cache.db"))
+ollama = OllamaClient(cache=llm_cache)
+
+# Local classifier answers confident category suggestions without calling the LLM
+category_classifier = CategoryClassifier(VALID_CATEGORIES)
+CATEGORY_CONFIDENCE = 0.9
+
+# Ollama context tokens per chat conversation, so follow-up turns reuse the
+# already-processed history instead of resending it
+CHAT_RECENT_TASKS = 50
+CHAT_CONTEXT_TOKENS = 400  # budget for the server-built stats/tasks block
+CHAT_HISTORY_TOKENS = 4096  # conversations longer than this start over
+MAX_CONVERSATIONS = 100
+conversations: "OrderedDict[str, List[int]]" = OrderedDict()
+
 
 class OllamaStatusResponse(BaseModel):
     available: bool
     models: List[Dict]
 
 
-class GenerateTitleRequest(BaseModel):
+class OllamaRequest(BaseModel):
+    """Model and URL default to the ones configured in settings"""
+    model: Optional[str] = None
+    url: Optional[str] = None
+
+    @model_validator(mode="after")
+    def use_configured_ollama(self):
+        self.model = self.model or get_setting_value("ollama_model")
+        self.url = self.url or get_setting_value("ollama_url")
+        return self
+
+
+class GenerateTitleRequest(OllamaRequest):
     description: str
-    model: Optional[str] = "mistral:7b-instruct-q4_0"
-    url: Optional[str] = "http://localhost:11434"
 
 
-class GenerateSummaryRequest(BaseModel):
+class GenerateSummaryRequest(OllamaRequest):
     tasks: List[Dict]
-    model: Optional[str] = "mistral:7b-instruct-q4_0"
-    url: Optional[str] = "http://localhost:11434"
+    chunk_by: Optional[str] = None  # "day" or "category"; defaults to "day" for long histories
 
 
-class GenerateCategoryRequest(BaseModel):
+class GenerateCategoryRequest(OllamaRequest):
     title: str
     description: Optional[str] = None
-    model: Optional[str] = "mistral:7b-instruct-q4_0"
-    url: Optional[str] = "http://localhost:11434"
 
 
-class EnhanceTaskRequest(BaseModel):
+class EnhanceTaskRequest(OllamaRequest):
     user_input: str
-    model: Optional[str] = "mistral:7b-instruct-q4_0"
-    url: Optional[str] = "http://localhost:11434"
+    timeout: Optional[float] = 30.0  # seconds before returning partial results
 
 
-class ChatRequest(BaseModel):
+class ChatRequest(OllamaRequest):
     message: str
-    context: Dict
-    model: Optional[str] = "mistral:7b-instruct-q4_0"
-    url: Optional[str] = "http://localhost:11434"
+    context: Optional[Dict] = None  # optional client hints; stats are built server-side
+    conversation_id: Optional[str] = None
 
 
 @router.get("/status", response_model=OllamaStatusResponse)
-def get_ollama_status(url: Optional[str] = Query(None, description="Ollama API URL")):
+async def get_ollama_status(
+    url: Optional[str] = Query(None, description="Ollama API URL"),
+    refresh: bool = Query(False, description="Bypass the cached availability"),
+):
     """Check if Ollama is available and get list of models"""
     # Use provided URL or default
-    ollama_url = url or "http://localhost:11434"
+    ollama_url = url or get_setting_value("ollama_url")
     
     print(f"[AI Status] Checking Ollama at {ollama_url}")
-    available = check_ollama_available(ollama_url)
-    models = get_ollama_models(ollama_url) if available else []
+    health = await ollama.get_health(ollama_url, force=refresh)
     
     return {
-        "available": available,
-        "models": models
+        "available": health.available,
+        "models": health.models if health.available else []
     }
 
 
+@router.get("/cache/stats")
+def get_cache_stats():
+    """Get LLM response cache hit/miss counters and size"""
+    return llm_cache.stats()
+
+
+@router.delete("/cache")
+def clear_cache():
+    """Drop all cached LLM responses"""
+    llm_cache.clear()
+    return {"message": "AI cache cleared"}
+
+
 @router.post("/generate-title")
-def generate_title(request: GenerateTitleRequest):
-    """Generate a task title from description"""
-    if not check_ollama_available(request.url):
+async def generate_title(request: GenerateTitleRequest):
+    """Generate a task title from description (cached titles are served even while Ollama is down)"""
+    title = ollama.lookup("title", request.model, request.description)
+    if title:
+        return {"title": title}
+    
+    if not await ollama.is_available(request.url):
         raise HTTPException(status_code=503, detail="Ollama is not available")
     
-    title = generate_task_title(request.description, request.model, request.url)
+    title = await ollama.generate_task_title(request.description, request.model, request.url)
     
     if not title:
         raise HTTPException(status_code=500, detail="Failed to generate title")
@@ -88,27 +137,112 @@ def generate_title(request: GenerateTitleRequest):
     return {"title": title}
 
 
+def load_cached_summaries(db: Session, keys: List[str]) -> Dict[str, str]:
+    """Look up chunk summaries cached in the sessions table by content key"""
+    rows = db.query(WorkSession.summary_key, WorkSession.summary) \
+        .filter(WorkSession.summary_key.in_(keys)).all()
+    return {key: summary for key, summary in rows if summary}
+
+
+def store_summaries(db: Session, chunk_by: str, entries: List[tuple]):
+    """Cache new chunk summaries.
+    
+    A day chunk covers one date, so its new summary replaces older versions
+    of that day (for the same model). Category chunks of different periods
+    share labels, so they are kept side by side.
+    """
+    for key, tasks, summary in entries:
+        if chunk_by == "day":
+            prefix = key.rsplit(":", 1)[0] + ":"
+            db.query(WorkSession).filter(
+                WorkSession.summary_key.startswith(prefix, autoescape=True),
+                WorkSession.summary_key != key,
+            ).delete(synchronize_session=False)
+        
+        start_times = [task["start_time"] for task in tasks if task.get("start_time")]
+        values = {
+            "date": datetime.fromisoformat(min(start_times)) if start_times else datetime.utcnow(),
+            "total_time": round(sum(task.get("duration") or 0 for task in tasks), 2),
+            "tasks_count": len(tasks),
+            "summary": summary,
+            "summary_key": key,
+            "created_at": datetime.utcnow(),
+        }
+        stmt = insert(WorkSession).values(**values)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["summary_key"],
+            set_={"summary": stmt.excluded.summary, "created_at": stmt.excluded.created_at},
+        ))
+    db.commit()
+
+
 @router.post("/generate-summary")
-def generate_summary(request: GenerateSummaryRequest):
-    """Generate a summary of tasks"""
-    if not check_ollama_available(request.url):
+async def generate_summary(request: GenerateSummaryRequest, db: Session = Depends(get_db)):
+    """Generate a summary of tasks.
+    
+    Long histories are summarized map-reduce style: tasks are chunked by day
+    or category, chunk summaries are generated concurrently (reusing any
+    cached in the sessions table for unchanged chunks) and then combined.
+    """
+    chunk_by = request.chunk_by
+    if chunk_by is None and len(request.tasks) > summarizer.CHUNK_THRESHOLD:
+        chunk_by = "day"
+    if chunk_by is not None and chunk_by not in summarizer.CHUNK_MODES:
+        raise HTTPException(status_code=400, detail="chunk_by must be 'day' or 'category'")
+    
+    if not await ollama.is_available(request.url):
         raise HTTPException(status_code=503, detail="Ollama is not available")
     
-    summary = generate_task_summary(request.tasks, request.model, request.url)
+    if chunk_by is None:
+        summary = await ollama.generate_task_summary(request.tasks, request.model, request.url)
+        if not summary:
+            raise HTTPException(status_code=500, detail="Failed to generate summary")
+        return {"summary": summary}
+    
+    # Map: summarize only the chunks whose content changed since last time
+    chunks = summarizer.chunk_tasks(request.tasks, chunk_by)
+    keys = {label: summarizer.chunk_key(chunk_by, label, request.model, tasks) for label, tasks in chunks.items()}
+    cached = await run_in_threadpool(load_cached_summaries, db, list(keys.values()))
+    missing = {label: tasks for label, tasks in chunks.items() if keys[label] not in cached}
+    generated = await summarizer.summarize_chunks(ollama, missing, request.model, request.url)
+    
+    # An empty answer is a failure too; never cache it
+    if not all(generated.values()):
+        raise HTTPException(status_code=500, detail="Failed to generate summary")
+    await run_in_threadpool(store_summaries, db, chunk_by, [
+        (keys[label], missing[label], summary) for label, summary in generated.items()
+    ])
+    
+    # Reduce: combine chunk summaries in label order
+    parts = [(label, generated[label] if label in generated else cached[keys[label]]) for label in chunks]
+    summary = await summarizer.reduce_summaries(ollama, parts, request.model, request.url)
     
     if not summary:
         raise HTTPException(status_code=500, detail="Failed to generate summary")
     
-    return {"summary": summary}
+    return {
+        "summary": summary,
+        "chunks": len(chunks),
+        "chunks_generated": len(generated),
+    }
 
 
 @router.post("/generate-category")
-def generate_category(request: GenerateCategoryRequest):
-    """Suggest a category for a task"""
-    if not check_ollama_available(request.url):
+async def generate_category(request: GenerateCategoryRequest, db: Session = Depends(get_db)):
+    """Suggest a category for a task, from the local classifier when it is confident"""
+    await run_in_threadpool(category_classifier.sync, db)
+    category, confidence = category_classifier.predict(f"{request.title} {request.description or ''}")
+    if category and confidence >= CATEGORY_CONFIDENCE:
+        return {"category": category, "source": "local", "confidence": round(confidence, 3)}
+    
+    category = ollama.lookup("category", request.model, category_text(request.title, request.description))
+    if category:
+        return {"category": category, "source": "ollama"}
+    
+    if not await ollama.is_available(request.url):
         raise HTTPException(status_code=503, detail="Ollama is not available")
     
-    category = generate_category_suggestion(
+    category = await ollama.generate_category_suggestion(
         request.title,
         request.description or "",
         request.model,
@@ -118,18 +252,39 @@ def generate_category(request: GenerateCategoryRequest):
     if not category:
         raise HTTPException(status_code=500, detail="Failed to generate category")
     
-    return {"category": category}
+    return {"category": category, "source": "ollama"}
 
 
 @router.post("/enhance-task")
-def enhance_task(request: EnhanceTaskRequest):
+async def enhance_task(request: EnhanceTaskRequest):
     """Generate both enhanced title and description from user input"""
-    if not check_ollama_available(request.url):
-        raise HTTPException(status_code=503, detail="Ollama is not available")
+    # Answer from the response cache when both are there, even while Ollama is down
+    title = ollama.lookup("title", request.model, request.user_input)
+    description = ollama.lookup("description", request.model, request.user_input)
     
-    # Generate title and description in parallel would be ideal, but for now do it sequentially
-    title = generate_task_title(request.user_input, request.model, request.url)
-    description = generate_enhanced_description(request.user_input, request.model, request.url)
+    if not (title and description):
+        if not await ollama.is_available(request.url):
+            raise HTTPException(status_code=503, detail="Ollama is not available")
+        
+        # Generate whatever missed in parallel, keeping whatever finishes within the timeout
+        generations = {}
+        if not title:
+            generations["title"] = asyncio.create_task(
+                ollama.generate_task_title(request.user_input, request.model, request.url)
+            )
+        if not description:
+            generations["description"] = asyncio.create_task(
+                ollama.generate_enhanced_description(request.user_input, request.model, request.url)
+            )
+        done, pending = await asyncio.wait(set(generations.values()), timeout=request.timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"[AI Enhance] {len(pending)} generation(s) timed out after {request.timeout}s")
+        
+        results = {name: task.result() for name, task in generations.items() if task in done}
+        title = title or results.get("title")
+        description = description or results.get("description")
     
     # Fallback to user input if generation fails
     if not title:
@@ -143,32 +298,89 @@ def enhance_task(request: EnhanceTaskRequest):
     }
 
 
+def remember_conversation(conversation_id: str, context: Optional[List[int]]):
+    """Keep a conversation's Ollama context tokens, dropping it once it outgrows the budget"""
+    conversations.pop(conversation_id, None)
+    if not context or len(context) > CHAT_HISTORY_TOKENS:
+        return
+    conversations[conversation_id] = context
+    while len(conversations) > MAX_CONVERSATIONS:
+        conversations.popitem(last=False)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+def build_chat_context(db: Session, token_budget: int = CHAT_CONTEXT_TOKENS, current_task: Optional[str] = None) -> str:
+    """Build the chat assistant's context block from the database.
+
+    Stats and the running task always fit; recent tasks are listed newest
+    first until `token_budget` is used up, and the remainder is folded into
+    a one-line summary so the prompt size stays bounded however long the
+    history grows.
+    """
+    totals = get_totals(db)
+    today = totals["today"]
+    all_time = totals["all_time"]
+    
+    if current_task is None:
+        current_task = db.execute(
+            select(Task.title)
+            .where(Task.status == "in_progress")
+            .order_by(Task.start_time.desc())
+            .limit(1)
+        ).scalar() or "None"
+    
+    recent = db.execute(
+        select(Task.title, Task.duration, Task.category)
+        .where(Task.status == "completed")
+        .order_by(Task.start_time.desc())
+        .limit(CHAT_RECENT_TASKS)
+    ).all()
+    
+    header = f"""Current Context:
+- Today's Stats: {today['tasks_count']} tasks, {today['total_time']} minutes tracked
+- All Time: {all_time['tasks_count']} tasks, {all_time['total_time']} minutes total
+- Current Task: {current_task}
+"""
+    used = estimate_tokens(header)
+    
+    lines: List[str] = []
+    for index, (title, duration, category) in enumerate(recent):
+        line = f'  - "{title}" ({round(duration or 0)} min{", " + category if category else ""})'
+        if used + estimate_tokens(line) > token_budget:
+            # Summarize whatever does not fit instead of listing it
+            rest = recent[index:]
+            categories = Counter(category or "Uncategorized" for _, _, category in rest)
+            minutes = round(sum(duration or 0 for _, duration, _ in rest))
+            top = ", ".join(f"{name} x{count}" for name, count in categories.most_common(3))
+            lines.append(f"  - ...and {len(rest)} earlier tasks ({minutes} min; {top})")
+            break
+        lines.append(line)
+        used += estimate_tokens(line)
+    
+    recent_block = "\n".join(lines) if lines else "  - None"
+    return f"{header}- Recent Tasks:\n{recent_block}\n"
+
+
 @router.post("/chat")
-def chat(request: ChatRequest):
+async def chat(request: ChatRequest, db: Session = Depends(get_db)):
     """Chat with AI assistant about productivity and tasks (streaming)"""
     print(f"[AI Chat] Received request with message: {request.message}")
     print(f"[AI Chat] Model: {request.model}, URL: {request.url}")
     
-    if not check_ollama_available(request.url):
+    if not await ollama.is_available(request.url):
         print("[AI Chat] Ollama is not available")
         raise HTTPException(status_code=503, detail="Ollama is not available")
     
-    # Build context from provided data
-    context = request.context
-    today_stats = context.get("today_stats", {})
-    alltime_stats = context.get("alltime_stats", {})
-    recent_tasks = context.get("recent_tasks", [])
-    current_task = context.get("current_task", "None")
-    
-    print(f"[AI Chat] Context - Today: {today_stats}, All time: {alltime_stats}")
+    # Build context from the database, capped to a fixed token budget
+    current_task = (request.context or {}).get("current_task")
+    context_str = await run_in_threadpool(build_chat_context, db, CHAT_CONTEXT_TOKENS, current_task)
     
-    # Create context string
-    context_str = f"""Current Context:
-- Today's Stats: {today_stats.get('tasks_count', 0)} tasks, {today_stats.get('total_time', 0)} minutes tracked
-- All Time: {alltime_stats.get('tasks_count', 0)} tasks, {alltime_stats.get('total_time', 0)} minutes total
-- Recent Tasks: {', '.join(recent_tasks) if recent_tasks else 'None'}
-- Current Task: {current_task}
-"""
+    conversation_id = request.conversation_id or secrets.token_urlsafe(12)
+    history = conversations.get(conversation_id)
     
     prompt = f"""{context_str}
 
@@ -176,52 +388,37 @@ User Question: {request.message}
 
 You are a helpful productivity assistant for the TRAK time tracking app. Provide concise, friendly, and actionable insights based on the user's tasks and productivity data. Keep responses brief (2-3 sentences max). Be encouraging and supportive."""
 
-    def generate():
+    async def generate():
         try:
             print(f"[AI Chat] Sending streaming request to Ollama...")
+            yield f"data: {json.dumps({'conversation_id': conversation_id})}\n\n"
             
-            response = requests.post(
-                f"{request.url}/api/generate",
-                json={
-                    "model": request.model,
-                    "prompt": prompt,
-                    "stream": True,  # Enable streaming
-                    "options": {
-                        "temperature": 0.7,
-                        "max_tokens": 200,
-                    }
-                },
-                stream=True,
-                timeout=30
-            )
-            
-            if response.status_code != 200:
-                error_msg = f"Failed to get AI response: {response.status_code}"
-                print(f"[AI Chat] Error: {error_msg}")
-                yield f"data: {json.dumps({'error': error_msg})}\n\n"
-                return
-            
-            print(f"[AI Chat] Streaming response...")
-            
-            # Stream the response
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        chunk = json.loads(line)
-                        if "response" in chunk:
-                            token = chunk["response"]
-                            # Send token as SSE
-                            yield f"data: {json.dumps({'token': token})}\n\n"
-                        
-                        # Check if done
-                        if chunk.get("done", False):
-                            yield f"data: {json.dumps({'done': True})}\n\n"
-                            print(f"[AI Chat] Streaming complete")
-                            break
-                    except json.JSONDecodeError:
-                        continue
-                        
-        except requests.exceptions.RequestException as e:
+            # Stream the response, coalescing tiny tokens into fewer SSE frames
+            chunks = ollama.stream_generate(prompt, request.model, request.url, {
+                "temperature": 0.7,
+                "max_tokens": 200,
+            }, context=history)
+            async for text, final in coalesce_tokens(chunks):
+                if text:
+                    # Send token as SSE
+                    yield f"data: {json.dumps({'token': text})}\n\n"
+                
+                # Check if done
+                if final is not None:
+                    remember_conversation(conversation_id, final.get("context"))
+                    yield f"data: {json.dumps({'done': True})}\n\n"
+                    print(f"[AI Chat] Streaming complete")
+                    
+        except asyncio.CancelledError:
+            # Client went away: leaving the stream closes the upstream request,
+            # which makes Ollama stop generating
+            print(f"[AI Chat] Client disconnected, cancelled Ollama generation")
+            raise
+        except httpx.HTTPStatusError as e:
+            error_msg = str(e)
+            print(f"[AI Chat] Error: {error_msg}")
+            yield f"data: {json.dumps({'error': error_msg})}\n\n"
+        except httpx.HTTPError as e:
             error_msg = f"Cannot connect to Ollama: {str(e)}"
             print(f"[AI Chat] Connection error: {error_msg}")
             yield f"data: {json.dumps({'error': error_msg})}\n\n"
@@ -1,20 +1,32 @@
 from fastapi import APIRouter, HTTPException, Response, Cookie
 from pydantic import BaseModel
 from typing import Optional
+from collections import OrderedDict
 import sys
 import os
 import hashlib
-import secrets
+import threading
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from database import SessionLocal
+from database import DATA_DIR, SessionLocal
 from models import User
+from utils.session_store import SessionStore
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-# Simple in-memory session store (for demo - use Redis in production)
-active_sessions = {}
+SESSION_MAX_AGE = 30 * 24 * 60 * 60  # 30 days, matching the cookie
+# Sessions survive restarts in sessions.db unless TRAK_PERSIST_SESSIONS=0
+PERSIST_SESSIONS = os.getenv("TRAK_PERSIST_SESSIONS", "1") != "0"
+active_sessions = SessionStore(
+    os.path.join(DATA_DIR, "sessions.db") if PERSIST_SESSIONS else None,
+    ttl=SESSION_MAX_AGE,
+)
+
+# Recently resolved users, so authenticated requests skip the users table
+USER_CACHE_SIZE = 256
+user_cache = OrderedDict()
+user_cache_lock = threading.Lock()
 
 
 class SignupRequest(BaseModel):
@@ -35,18 +47,41 @@ def hash_password(password: str) -> str:
 
 def create_session(user_id: int) -> str:
     """Create a new session token"""
-    session_token = secrets.token_urlsafe(32)
-    active_sessions[session_token] = user_id
-    return session_token
+    return active_sessions.create(user_id)
 
 
 def get_user_from_session(session_token: Optional[str]) -> Optional[int]:
     """Get user_id from session token"""
-    if not session_token:
-        return None
     return active_sessions.get(session_token)
 
 
+def remember_user(user: User) -> dict:
+    """Cache a user's public fields, evicting the least recently used"""
+    record = {"id": user.id, "username": user.username, "email": user.email}
+    with user_cache_lock:
+        user_cache[user.id] = record
+        user_cache.move_to_end(user.id)
+        while len(user_cache) > USER_CACHE_SIZE:
+            user_cache.popitem(last=False)
+    return record
+
+
+def get_user(user_id: int) -> Optional[dict]:
+    """Look up a user's public fields, from the cache when possible"""
+    with user_cache_lock:
+        record = user_cache.get(user_id)
+        if record is not None:
+            user_cache.move_to_end(user_id)
+            return record
+    
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        return remember_user(user) if user else None
+    finally:
+        db.close()
+
+
 @router.post("/signup")
 def signup(request: SignupRequest, response: Response):
     """Create a new user account"""
@@ -81,17 +116,13 @@ def signup(request: SignupRequest, response: Response):
             key="session_token",
             value=session_token,
             httponly=True,
-            max_age=30 * 24 * 60 * 60,  # 30 days
+            max_age=SESSION_MAX_AGE,
             samesite="lax"
         )
         
         return {
             "success": True,
-            "user": {
-                "id": new_user.id,
-                "username": new_user.username,
-                "email": new_user.email
-            }
+            "user": remember_user(new_user),
         }
     finally:
         db.close()
@@ -118,17 +149,13 @@ def login(request: LoginRequest, response: Response):
             key="session_token",
             value=session_token,
             httponly=True,
-            max_age=30 * 24 * 60 * 60,  # 30 days
+            max_age=SESSION_MAX_AGE,
             samesite="lax"
         )
         
         return {
             "success": True,
-            "user": {
-                "id": user.id,
-                "username": user.username,
-                "email": user.email
-            }
+            "user": remember_user(user),
         }
     finally:
         db.close()
@@ -137,8 +164,7 @@ def login(request: LoginRequest, response: Response):
 @router.post("/logout")
 def logout(response: Response, session_token: Optional[str] = Cookie(None)):
     """Logout and clear session"""
-    if session_token and session_token in active_sessions:
-        del active_sessions[session_token]
+    active_sessions.delete(session_token)
     
     response.delete_cookie(key="session_token")
     return {"success": True}
@@ -151,19 +177,10 @@ def get_current_user(session_token: Optional[str] = Cookie(None)):
     if not user_id:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    db = SessionLocal()
-    try:
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise HTTPException(status_code=401, detail="User not found")
-        
-        return {
-            "id": user.id,
-            "username": user.username,
-            "email": user.email
-        }
-    finally:
-        db.close()
+    user = get_user(user_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
 
 
 @router.get("/check")
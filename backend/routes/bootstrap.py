@@ -0,0 +1,126 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, List, Optional
+import asyncio
+import httpx
+
+from database import begin_read, get_db
+from models import Task
+from routes.settings import settings_cache
+from routes.tasks import TASK_COLUMNS, get_stats_summary, orjson_response, task_row_dicts
+from utils.data_version import conditional_get
+
+router = APIRouter(tags=["bootstrap"])
+
+BOOTSTRAP_TASKS = 100  # same page size as GET /tasks/
+MAX_BATCH = 20
+BATCH_TIMEOUT = 10.0  # seconds per item
+BATCH_BASE_URL = httpx.URL("http://trak")
+# Reads that can be batched; anything else (/batch itself, the never-ending /events feed,
+# /tasks/export downloads, AI calls) is rejected
+BATCHABLE = ("/tasks", "/settings", "/bootstrap", "/auth/me", "/auth/check")
+UNBATCHABLE = ("/tasks/export",)
+
+
+class BatchItem(BaseModel):
+    path: str
+    headers: Optional[Dict[str, str]] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
+
+
+@router.get("/bootstrap", dependencies=[conditional_get("tasks", "settings", daily=True)])
+def get_bootstrap(response: Response, db: Session = Depends(get_db)):
+    """Initial app state in one round trip: the same payloads as /tasks/,
+    /tasks/today, /tasks/stats/summary and /settings/, read in one transaction.
+    
+    Task rows are loaded once; today's tasks come from the recent page, and
+    only those older than the page are queried separately.
+    """
+    begin_read(db)
+    order = (Task.start_time.desc(), Task.id.desc())
+    recent_rows = db.query(*TASK_COLUMNS).order_by(*order).limit(BOOTSTRAP_TASKS).all()
+    recent = task_row_dicts(recent_rows)
+    
+    today = datetime.utcnow().date()
+    today_tasks = [task for task in recent if task["start_time"] >= today.isoformat()]
+    if len(recent) == BOOTSTRAP_TASKS and today_tasks and today_tasks[-1] is recent[-1]:
+        last = recent[-1]
+        older_rows = db.query(*TASK_COLUMNS).filter(
+            Task.start_time >= today,
+            tuple_(Task.start_time, Task.id) < tuple_(datetime.fromisoformat(last["start_time"]), last["id"]),
+        ).order_by(*order).all()
+        today_tasks += task_row_dicts(older_rows)
+    
+    return orjson_response({
+        "tasks": recent,
+        "today": today_tasks,
+        "stats": get_stats_summary(db=db),
+        "settings": dict(settings_cache.load(db)),
+    }, response)
+
+
+def batch_url(path: str) -> Optional[httpx.URL]:
+    """The in-process URL for a batch item's path, or None if it may not be batched.
+    
+    The path is checked as it will be routed: joined to the base URL (which
+    resolves dot segments) and percent-decoded.
+    """
+    if not path.startswith("/") or path.startswith("//"):
+        return None
+    url = BATCH_BASE_URL.join(path)
+    segments = url.path.split("/")
+    if url.host != BATCH_BASE_URL.host or "." in segments or ".." in segments:
+        return None
+    
+    def under(prefix: str) -> bool:
+        return url.path == prefix or url.path.startswith(prefix + "/")
+    
+    if not any(under(prefix) for prefix in BATCHABLE) or any(under(prefix) for prefix in UNBATCHABLE):
+        return None
+    return url
+
+
+@router.post("/batch")
+async def batch(batch_request: BatchRequest, request: Request):
+    """Run several GET requests against this API in one round trip.
+    
+    Each item is dispatched in-process with the caller's cookies plus its own
+    headers (e.g. If-None-Match), and answered with its status, ETag and
+    cursor headers and JSON body, in request order. Only paths under
+    BATCHABLE are accepted, and an item that takes longer than
+    BATCH_TIMEOUT seconds is answered with a 504.
+    """
+    if len(batch_request.requests) > MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH} requests per batch")
+    urls = [batch_url(item.path) for item in batch_request.requests]
+    if None in urls:
+        allowed = ", ".join(BATCHABLE)
+        raise HTTPException(status_code=400, detail=f"Paths must be absolute and under one of: {allowed}")
+    
+    cookie = request.headers.get("cookie")
+    transport = httpx.ASGITransport(app=request.app)
+    async with httpx.AsyncClient(transport=transport) as client:
+        async def fetch(item: BatchItem, url: httpx.URL) -> Dict:
+            headers = {"cookie": cookie} if cookie else {}
+            headers.update(item.headers or {})
+            try:
+                result = await asyncio.wait_for(client.get(url, headers=headers), BATCH_TIMEOUT)
+            except asyncio.TimeoutError:
+                return {"path": item.path, "status": 504, "headers": {}, "body": {"detail": "Batch item timed out"}}
+            body = None
+            if result.content:
+                body = result.json() if "json" in result.headers.get("content-type", "") else result.text
+            return {
+                "path": item.path,
+                "status": result.status_code,
+                "headers": {name: result.headers[name] for name in ("etag", "x-next-cursor") if name in result.headers},
+                "body": body,
+            }
+        
+        return await asyncio.gather(*(fetch(item, url) for item, url in zip(batch_request.requests, urls)))
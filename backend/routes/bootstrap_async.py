@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_db
+from routes import bootstrap
+from utils.data_version import conditional_get
+
+# Async variant of /bootstrap, served instead of routes.bootstrap when
+# TRAK_ASYNC_DB is enabled. /batch touches no database and is shared as is.
+router = APIRouter(tags=["bootstrap"])
+
+
+@router.get("/bootstrap", dependencies=[conditional_get("tasks", "settings", daily=True)])
+async def get_bootstrap(response: Response, db: AsyncSession = Depends(get_async_db)):
+    """Initial app state in one round trip, read in one transaction"""
+    return await db.run_sync(lambda session: bootstrap.get_bootstrap(response, db=session))
+
+
+router.add_api_route("/batch", bootstrap.batch, methods=["POST"])
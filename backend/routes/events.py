@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import json
+
+from utils.events import events
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.get("/")
+async def stream_events(
+    after: Optional[int] = Query(None, ge=0, description="Resume after this sequence number"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """Stream task changes as server-sent events.
+    
+    Each event carries its sequence number as the SSE id, so a reconnecting
+    EventSource resumes from Last-Event-ID automatically. Event types are
+    task.created, task.updated, task.stopped and task.deleted (with the task
+    or its id), tasks.imported after a bulk import, and reset when missed
+    events are no longer available and the client should refetch.
+    """
+    if after is None and last_event_id and last_event_id.isdigit():
+        after = int(last_event_id)
+    
+    async def generate():
+        start = after
+        if start is None:
+            # Tell new clients where the feed starts, so a reconnect resumes from there
+            start = events.seq
+            yield f"id: {start}\nevent: ready\ndata: {{}}\n\n"
+        async for event in events.subscribe(start):
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            seq, event_type, data = event
+            yield f"id: {seq}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
@@ -1,13 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Dict, Optional
 from pydantic import BaseModel
+import threading
 
-from database import get_db
+from database import get_db, SessionLocal
 from models import Settings
+from utils.data_version import conditional_get, data_version
 
 router = APIRouter(prefix="/settings", tags=["settings"])
 
+# Values for known settings that have not been saved yet
+DEFAULTS = {
+    "use_ai": "false",
+    "ollama_model": "mistral:7b-instruct-q4_0",
+    "ollama_url": "http://localhost:11434",
+    "theme": "system",
+}
+
 
 class SettingUpdate(BaseModel):
     key: str
@@ -19,28 +29,64 @@ class SettingResponse(BaseModel):
     value: Optional[str]
 
 
-@router.get("/", response_model=dict)
-def get_all_settings(db: Session = Depends(get_db)):
-    """Get all settings as a dictionary"""
-    settings = db.query(Settings).all()
-    return {setting.key: setting.value for setting in settings}
+class SettingsCache:
+    """Snapshot of the settings table, loaded once and kept current write-through.
+    
+    Writes replace the snapshot dict rather than mutating it, so readers never
+    need the lock.
+    """
+    
+    def __init__(self):
+        self._values: Optional[Dict[str, Optional[str]]] = None
+        self._lock = threading.Lock()
+    
+    def load(self, db: Optional[Session] = None) -> Dict[str, Optional[str]]:
+        """Return the snapshot, reading the table on first use"""
+        values = self._values
+        if values is not None:
+            return values
+        with self._lock:
+            if self._values is None:
+                session = db or SessionLocal()
+                try:
+                    self._values = {key: value for key, value in session.query(Settings.key, Settings.value)}
+                finally:
+                    if db is None:
+                        session.close()
+            return self._values
+    
+    def set(self, key: str, value: Optional[str]):
+        with self._lock:
+            if self._values is not None:
+                self._values = {**self._values, key: value}
+    
+    def delete(self, key: str):
+        with self._lock:
+            if self._values is not None:
+                self._values = {k: v for k, v in self._values.items() if k != key}
+
+
+settings_cache = SettingsCache()
 
 
-@router.get("/{key}", response_model=SettingResponse)
+def get_setting_value(key: str, db: Optional[Session] = None) -> Optional[str]:
+    """A setting's saved value, or its default, from the cache"""
+    values = settings_cache.load(db)
+    return values[key] if key in values else DEFAULTS.get(key)
+
+
+@router.get("/", response_model=dict, dependencies=[conditional_get("settings")])
+def get_all_settings(keys: Optional[str] = None, db: Session = Depends(get_db)):
+    """Get all settings as a dictionary, or only the comma-separated `keys` (with defaults)"""
+    if keys:
+        return {key: get_setting_value(key, db) for key in keys.split(",") if key}
+    return dict(settings_cache.load(db))
+
+
+@router.get("/{key}", response_model=SettingResponse, dependencies=[conditional_get("settings")])
 def get_setting(key: str, db: Session = Depends(get_db)):
     """Get a specific setting"""
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if not setting:
-        # Return default values for known settings
-        defaults = {
-            "use_ai": "false",
-            "ollama_model": "mistral:7b-instruct-q4_0",
-            "ollama_url": "http://localhost:11434",
-            "theme": "system",
-        }
-        return {"key": key, "value": defaults.get(key, None)}
-    
-    return {"key": setting.key, "value": setting.value}
+    return {"key": key, "value": get_setting_value(key, db)}
 
 
 @router.post("/", response_model=SettingResponse)
@@ -55,6 +101,8 @@ def update_setting(setting: SettingUpdate, db: Session = Depends(get_db)):
         db.add(db_setting)
     
     db.commit()
+    settings_cache.set(setting.key, setting.value)
+    data_version.bump("settings")
     db.refresh(db_setting)
     return {"key": db_setting.key, "value": db_setting.value}
 
@@ -68,24 +116,22 @@ def delete_setting(key: str, db: Session = Depends(get_db)):
     
     db.delete(setting)
     db.commit()
+    settings_cache.delete(key)
+    data_version.bump("settings")
     return {"message": "Setting deleted successfully"}
 
 
 @router.post("/initialize")
 def initialize_settings(db: Session = Depends(get_db)):
     """Initialize default settings if they don't exist"""
-    defaults = {
-        "use_ai": "false",
-        "ollama_model": "mistral:7b-instruct-q4_0",
-        "ollama_url": "http://localhost:11434",
-        "theme": "system",
-    }
+    existing = {key for (key,) in db.query(Settings.key).filter(Settings.key.in_(DEFAULTS))}
+    missing = {key: value for key, value in DEFAULTS.items() if key not in existing}
     
-    for key, value in defaults.items():
-        existing = db.query(Settings).filter(Settings.key == key).first()
-        if not existing:
-            db.add(Settings(key=key, value=value))
+    for key, value in missing.items():
+        db.add(Settings(key=key, value=value))
     
     db.commit()
+    for key, value in missing.items():
+        settings_cache.set(key, value)
+    data_version.bump("settings")
     return {"message": "Settings initialized"}
-
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from database import get_async_db
+from routes import settings
+from routes.settings import SettingUpdate, SettingResponse
+from utils.data_version import conditional_get
+
+# Async variants of the /settings routes, served instead of routes.settings
+# when TRAK_ASYNC_DB is enabled. Route logic is shared with the sync module
+# and runs on the async session's connection via run_sync().
+router = APIRouter(prefix="/settings", tags=["settings"])
+
+
+@router.get("/", response_model=dict, dependencies=[conditional_get("settings")])
+async def get_all_settings(keys: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Get all settings as a dictionary, or only the comma-separated `keys` (with defaults)"""
+    return await db.run_sync(lambda session: settings.get_all_settings(keys, db=session))
+
+
+@router.get("/{key}", response_model=SettingResponse, dependencies=[conditional_get("settings")])
+async def get_setting(key: str, db: AsyncSession = Depends(get_async_db)):
+    """Get a specific setting"""
+    return await db.run_sync(lambda session: settings.get_setting(key, db=session))
+
+
+@router.post("/", response_model=SettingResponse)
+async def update_setting(setting: SettingUpdate, db: AsyncSession = Depends(get_async_db)):
+    """Update or create a setting"""
+    return await db.run_sync(lambda session: settings.update_setting(setting, db=session))
+
+
+@router.delete("/{key}")
+async def delete_setting(key: str, db: AsyncSession = Depends(get_async_db)):
+    """Delete a setting"""
+    return await db.run_sync(lambda session: settings.delete_setting(key, db=session))
+
+
+@router.post("/initialize")
+async def initialize_settings(db: AsyncSession = Depends(get_async_db)):
+    """Initialize default settings if they don't exist"""
+    return await db.run_sync(lambda session: settings.initialize_settings(db=session))
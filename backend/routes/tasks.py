@@ -1,14 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import String, func, case, delete, insert, select, text, tuple_, type_coerce
 from sqlalchemy.orm import Session
-from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, Iterator, List, Optional, Tuple, Union
+from pydantic import BaseModel, ValidationError
+import base64
+import csv
+import html
+import io
+import json
+import orjson
+import re
 
-from database import get_db
-from models import Task
+from database import get_db, SessionLocal
+from models import DailyRollup, TagRollup, Task, TaskTag
+from utils import rollups
+from utils.rollups import normalize_tags
+from utils.data_version import conditional_get, data_version
+from utils.events import events
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+EXPORT_FIELDS = [
+    "id", "title", "description", "category", "start_time", "end_time",
+    "duration", "status", "tags", "created_at", "updated_at",
+]
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_BATCH_SIZE = 500
+TAG_MATCHES = ("any", "all")
+# Columns for the list endpoints, with datetimes left as their stored text
+TASK_COLUMNS = (
+    Task.id, Task.title, Task.description, Task.category,
+    type_coerce(Task.start_time, String), type_coerce(Task.end_time, String),
+    Task.duration, Task.status, Task.tags,
+    type_coerce(Task.created_at, String), type_coerce(Task.updated_at, String),
+)
+SEARCH_TERM_RE = re.compile(r"\w+")
+# Matches are delimited with control characters so the text can be HTML-escaped before they become <mark>
+MARK_START, MARK_END = "\x02", "\x03"
+# bm25 column weights for title, description and tags in tasks_fts
+SEARCH_SQL = text("""
+    SELECT rowid,
+           highlight(tasks_fts, 0, :mark_start, :mark_end),
+           snippet(tasks_fts, 1, :mark_start, :mark_end, '…', 16),
+           bm25(tasks_fts, 10.0, 1.0, 5.0) AS rank
+    FROM tasks_fts WHERE tasks_fts MATCH :query
+    ORDER BY rank LIMIT :limit OFFSET :skip
+""")
+
 
 # Pydantic models for request/response
 class TaskCreate(BaseModel):
@@ -27,6 +68,19 @@ class TaskUpdate(BaseModel):
     tags: Optional[List[str]] = None
 
 
+class TaskImport(BaseModel):
+    title: str
+    description: Optional[str] = None
+    category: Optional[str] = None
+    tags: Optional[Union[List[str], str]] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    duration: Optional[float] = None
+    status: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
 class TaskResponse(BaseModel):
     id: int
     title: str
@@ -41,51 +95,413 @@ class TaskResponse(BaseModel):
     updated_at: str
 
 
+class TaskSearchResult(TaskResponse):
+    title_highlight: str
+    description_snippet: Optional[str]
+    rank: float
+
+
+def set_task_tags(db: Session, task_id: int, tags: List[str]):
+    """Replace a task's rows in task_tags"""
+    db.execute(delete(TaskTag).where(TaskTag.task_id == task_id))
+    if tags:
+        db.execute(insert(TaskTag), [{"task_id": task_id, "tag": tag} for tag in tags])
+
+
 @router.post("/", response_model=TaskResponse)
 def create_task(task: TaskCreate, db: Session = Depends(get_db)):
     """Create a new task"""
+    tags = normalize_tags(task.tags)
     db_task = Task(
         title=task.title,
         description=task.description,
         category=task.category,
-        tags=",".join(task.tags) if task.tags else None,
+        tags=",".join(tags) or None,
         start_time=datetime.utcnow(),
         status="in_progress"
     )
     db.add(db_task)
+    db.flush()
+    set_task_tags(db, db_task.id, tags)
+    rollups.add_task(db, db_task)
     db.commit()
+    data_version.bump("tasks")
     db.refresh(db_task)
-    return db_task.to_dict()
+    result = db_task.to_dict()
+    events.publish("task.created", result)
+    return result
+
+
+async def iter_bulk_items(request: Request) -> AsyncIterator[Tuple[int, object]]:
+    """Yield (index, item) pairs from a JSON array, an export file or an NDJSON body"""
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        # Parse NDJSON line by line as the body streams in
+        index = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, line
+                    index += 1
+        if buffer.strip():
+            yield index, buffer
+        return
+    
+    try:
+        data = json.loads(await request.body())
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    # Accept the export file format ({"tasks": [...]}) as well as a bare array
+    if isinstance(data, dict):
+        data = data.get("tasks")
+    if not isinstance(data, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of tasks")
+    for index, item in enumerate(data):
+        yield index, item
+
+
+def build_import_row(item: TaskImport, preserve_timestamps: bool, now: datetime) -> dict:
+    """Build an insert row for an imported task"""
+    row = {
+        "title": item.title,
+        "description": item.description,
+        "category": item.category,
+        "tags": ",".join(normalize_tags(item.tags)) or None,
+        "start_time": now,
+        "status": "in_progress",
+        "created_at": now,
+        "updated_at": now,
+    }
+    if preserve_timestamps:
+        row.update(
+            start_time=item.start_time or now,
+            end_time=item.end_time,
+            duration=item.duration or 0.0,
+            status=item.status or ("completed" if item.end_time else "in_progress"),
+            created_at=item.created_at or now,
+            updated_at=item.updated_at or now,
+        )
+    return row
+
+
+async def read_bulk_items(
+    request: Request,
+    preserve_timestamps: bool,
+    chunk_size: int,
+) -> Tuple[List[List[dict]], List[dict]]:
+    """Read and validate the whole import body into insert rows, batched by `chunk_size`.
+    
+    Nothing touches the database until the body has been fully read, so a slow
+    upload never holds the SQLite write lock. Returns the row batches and the
+    errors of the rows that failed validation.
+    """
+    chunk_size = max(1, chunk_size)
+    now = datetime.utcnow()
+    chunks = []
+    errors = []
+    chunk = []
+    
+    async for index, item in iter_bulk_items(request):
+        try:
+            if isinstance(item, bytes):
+                task = TaskImport.model_validate_json(item)
+            else:
+                task = TaskImport.model_validate(item)
+        except ValidationError as e:
+            errors.append({"index": index, "error": str(e)})
+            continue
+        
+        chunk.append(build_import_row(task, preserve_timestamps, now))
+        if len(chunk) >= chunk_size:
+            chunks.append(chunk)
+            chunk = []
+    
+    if chunk:
+        chunks.append(chunk)
+    return chunks, errors
+
+
+def insert_task_rows(db: Session, rows: List[dict]):
+    """Insert a batch of imported task rows, their tags and their daily rollups"""
+    if any(row["tags"] for row in rows):
+        task_ids = db.scalars(insert(Task).returning(Task.id, sort_by_parameter_order=True), rows).all()
+        db.execute(insert(TaskTag), [
+            {"task_id": task_id, "tag": tag}
+            for task_id, row in zip(task_ids, rows) if row["tags"]
+            for tag in row["tags"].split(",")
+        ])
+    else:
+        db.execute(insert(Task), rows)
+    rollups.add_rows(db, rows)
+
+
+def import_task_chunks(db: Session, chunks: List[List[dict]]) -> dict:
+    """Insert validated import batches in one transaction and commit"""
+    try:
+        for rows in chunks:
+            insert_task_rows(db, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {"imported": sum(len(rows) for rows in chunks)}
+
+
+@router.post("/bulk")
+async def bulk_import_tasks(
+    request: Request,
+    preserve_timestamps: bool = False,
+    chunk_size: int = 1000,
+):
+    """Import many tasks in one transaction.
+    
+    Accepts a JSON array, an export file ({"tasks": [...]}) or an NDJSON body
+    (Content-Type: application/x-ndjson). The body is validated in full before
+    anything is written, then rows are inserted in batches of `chunk_size`;
+    invalid rows are skipped and reported by index. Set `preserve_timestamps`
+    to keep the original start/end times, duration and status instead of
+    starting each task now.
+    """
+    chunks, errors = await read_bulk_items(request, preserve_timestamps, chunk_size)
+    
+    db = SessionLocal()
+    try:
+        result = await run_in_threadpool(import_task_chunks, db, chunks)
+    finally:
+        db.close()
+    data_version.bump("tasks")
+    events.publish("tasks.imported", {"imported": result["imported"]})
+    
+    return {**result, "failed": len(errors), "errors": errors}
+
+
+def stored_isoformat(value: Optional[str]) -> Optional[str]:
+    """Convert stored SQLite datetime text to the datetime.isoformat() form"""
+    if value is None:
+        return None
+    value = value.replace(" ", "T", 1)
+    return value[:-7] if value.endswith(".000000") else value
+
+
+def task_row_dicts(rows) -> List[dict]:
+    """Turn TASK_COLUMNS rows into dicts in the Task.to_dict shape"""
+    return [
+        {
+            "id": task_id,
+            "title": title,
+            "description": description,
+            "category": category,
+            "start_time": stored_isoformat(start_time),
+            "end_time": stored_isoformat(end_time),
+            "duration": duration,
+            "status": status,
+            "tags": tags.split(",") if tags else [],
+            "created_at": stored_isoformat(created_at),
+            "updated_at": stored_isoformat(updated_at),
+        }
+        for task_id, title, description, category, start_time, end_time,
+            duration, status, tags, created_at, updated_at in rows
+    ]
+
+
+def orjson_response(content, response: Response) -> Response:
+    """Encode content with orjson, keeping headers already set on the route's `response`"""
+    headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+    return Response(orjson.dumps(content), media_type="application/json", headers=headers)
+
+
+def serialize_task_rows(rows, response: Response) -> Response:
+    """Encode TASK_COLUMNS rows as a JSON response in the Task.to_dict shape.
+    
+    Skips building ORM objects, parsing datetimes and re-validating each row
+    against TaskResponse, which dominate the cost of large listings. Headers
+    already set on the route's `response` (ETag, X-Next-Cursor) are kept.
+    """
+    return orjson_response(task_row_dicts(rows), response)
+
 
+def encode_cursor(start_time: str, task_id: int) -> str:
+    """Encode a task's (start_time, id) position as an opaque page cursor"""
+    raw = json.dumps([start_time, task_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
-@router.get("/", response_model=List[TaskResponse])
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a page cursor back into its (start_time, id) position"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        start_time, task_id = json.loads(raw)
+        return datetime.fromisoformat(start_time), int(task_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/", response_model=List[TaskResponse], dependencies=[conditional_get("tasks")])
 def get_tasks(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
+    after: Optional[str] = None,
+    tag: Optional[List[str]] = Query(None),
+    tag_match: str = "any",
     db: Session = Depends(get_db)
 ):
-    """Get all tasks with optional filtering"""
-    query = db.query(Task)
+    """Get all tasks with optional filtering.
+    
+    Repeat `tag` to filter by several tags; `tag_match` chooses whether a task
+    needs any or all of them. Pass the X-Next-Cursor header of a page as
+    `after` to fetch the next page by keyset instead of offset, so deep pages
+    cost the same as the first one.
+    """
+    query = db.query(*TASK_COLUMNS)
     
     if status:
         query = query.filter(Task.status == status)
     
-    tasks = query.order_by(Task.start_time.desc()).offset(skip).limit(limit).all()
-    return [task.to_dict() for task in tasks]
+    if tag:
+        if tag_match not in TAG_MATCHES:
+            raise HTTPException(status_code=400, detail="tag_match must be 'any' or 'all'")
+        tags = normalize_tags(tag)
+        tagged = select(TaskTag.task_id).where(TaskTag.tag.in_(tags))
+        if tag_match == "all":
+            tagged = tagged.group_by(TaskTag.task_id).having(func.count(TaskTag.tag) == len(tags))
+        query = query.filter(Task.id.in_(tagged))
+    
+    if after:
+        query = query.filter(tuple_(Task.start_time, Task.id) < tuple_(*decode_cursor(after)))
+    
+    query = query.order_by(Task.start_time.desc(), Task.id.desc())
+    if not after:
+        query = query.offset(skip)
+    rows = query.limit(limit).all()
+    
+    if rows and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(stored_isoformat(rows[-1][4]), rows[-1][0])
+    return serialize_task_rows(rows, response)
 
 
-@router.get("/today", response_model=List[TaskResponse])
-def get_today_tasks(db: Session = Depends(get_db)):
+@router.get("/today", response_model=List[TaskResponse], dependencies=[conditional_get("tasks", daily=True)])
+def get_today_tasks(response: Response, db: Session = Depends(get_db)):
     """Get today's tasks"""
     today = datetime.utcnow().date()
-    tasks = db.query(Task).filter(
+    rows = db.query(*TASK_COLUMNS).filter(
         Task.start_time >= today
     ).order_by(Task.start_time.desc()).all()
-    return [task.to_dict() for task in tasks]
+    return serialize_task_rows(rows, response)
+
+
+def build_search_query(q: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix"""
+    terms = SEARCH_TERM_RE.findall(q)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms) + "*"
+
+
+def mark_matches(value: Optional[str]) -> Optional[str]:
+    """HTML-escape highlighted text, then turn the match delimiters into <mark> tags"""
+    if value is None:
+        return None
+    return html.escape(value).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+@router.get("/search", response_model=List[TaskSearchResult], dependencies=[conditional_get("tasks")])
+def search_tasks(q: str, skip: int = 0, limit: int = 20, db: Session = Depends(get_db)):
+    """Full-text search over titles, descriptions and tags, best matches first.
+    
+    `title_highlight` and the `description_snippet` excerpt are HTML: the
+    task text is escaped and matched terms are wrapped in <mark>. Page with
+    `skip` and `limit`.
+    """
+    query = build_search_query(q)
+    if query is None:
+        return []
+    
+    params = {"query": query, "limit": limit, "skip": skip, "mark_start": MARK_START, "mark_end": MARK_END}
+    matches = db.execute(SEARCH_SQL, params).all()
+    tasks = {task.id: task for task in db.query(Task).filter(Task.id.in_([row[0] for row in matches]))}
+    return [
+        {
+            **tasks[task_id].to_dict(),
+            "title_highlight": mark_matches(title),
+            "description_snippet": mark_matches(description),
+            "rank": rank,
+        }
+        for task_id, title, description, rank in matches
+    ]
+
+
+def build_export_query(start: Optional[date], end: Optional[date]):
+    """Select tasks for export in start_time order, streamed in batches"""
+    query = select(Task)
+    if start:
+        query = query.where(Task.start_time >= start)
+    if end:
+        query = query.where(Task.start_time < end + timedelta(days=1))
+    return query.order_by(Task.start_time, Task.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def format_export_batch(tasks: List[Task], format: str, header: bool = False) -> str:
+    """Serialize a batch of tasks as NDJSON or CSV text in the Task.to_dict shape"""
+    buffer = io.StringIO()
+    if format == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+        if header:
+            writer.writeheader()
+        for task in tasks:
+            row = task.to_dict()
+            row["tags"] = ",".join(row["tags"])
+            writer.writerow(row)
+    else:
+        for task in tasks:
+            buffer.write(json.dumps(task.to_dict()) + "\n")
+    return buffer.getvalue()
+
+
+def iter_export_rows(
+    format: str,
+    start: Optional[date],
+    end: Optional[date],
+) -> Iterator[str]:
+    """Stream tasks in batches from a server-side cursor as NDJSON or CSV text"""
+    db = SessionLocal()
+    try:
+        if format == "csv":
+            yield format_export_batch([], format, header=True)
+        for batch in db.scalars(build_export_query(start, end)).partitions():
+            yield format_export_batch(batch, format)
+    finally:
+        db.close()
 
 
-@router.get("/{task_id}", response_model=TaskResponse)
+def export_streaming_response(format: str, body: Union[Iterator[str], AsyncIterator[str]]) -> StreamingResponse:
+    """Wrap an export row stream in a downloadable response"""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"trak-export-{datetime.utcnow().date().isoformat()}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/export")
+def export_tasks(
+    format: str = "ndjson",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    """Stream the full task history as NDJSON or CSV, optionally between two dates (inclusive)"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Format must be 'ndjson' or 'csv'")
+    return export_streaming_response(format, iter_export_rows(format, start, end))
+
+
+@router.get("/{task_id}", response_model=TaskResponse, dependencies=[conditional_get("tasks")])
 def get_task(task_id: int, db: Session = Depends(get_db)):
     """Get a specific task"""
     task = db.query(Task).filter(Task.id == task_id).first()
@@ -101,6 +517,9 @@ def update_task(task_id: int, task_update: TaskUpdate, db: Session = Depends(get
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    # Move the task's contribution to whichever rollup row it ends up in
+    rollups.remove_task(db, task)
+    
     # Update fields
     if task_update.title is not None:
         task.title = task_update.title
@@ -111,7 +530,9 @@ def update_task(task_id: int, task_update: TaskUpdate, db: Session = Depends(get
     if task_update.status is not None:
         task.status = task_update.status
     if task_update.tags is not None:
-        task.tags = ",".join(task_update.tags)
+        tags = normalize_tags(task_update.tags)
+        task.tags = ",".join(tags) or None
+        set_task_tags(db, task.id, tags)
     if task_update.end_time is not None:
         task.end_time = datetime.fromisoformat(task_update.end_time.replace('Z', '+00:00'))
         # Calculate duration
@@ -119,9 +540,13 @@ def update_task(task_id: int, task_update: TaskUpdate, db: Session = Depends(get
             duration = (task.end_time - task.start_time).total_seconds() / 60
             task.duration = round(duration, 2)
     
+    rollups.add_task(db, task)
     db.commit()
+    data_version.bump("tasks")
     db.refresh(task)
-    return task.to_dict()
+    result = task.to_dict()
+    events.publish("task.updated", result)
+    return result
 
 
 @router.delete("/{task_id}")
@@ -131,8 +556,12 @@ def delete_task(task_id: int, db: Session = Depends(get_db)):
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    rollups.remove_task(db, task)
+    set_task_tags(db, task.id, [])
     db.delete(task)
     db.commit()
+    data_version.bump("tasks")
+    events.publish("task.deleted", {"id": task_id})
     return {"message": "Task deleted successfully"}
 
 
@@ -143,6 +572,7 @@ def stop_task(task_id: int, db: Session = Depends(get_db)):
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    rollups.remove_task(db, task)
     task.end_time = datetime.utcnow()
     task.status = "completed"
     
@@ -151,33 +581,67 @@ def stop_task(task_id: int, db: Session = Depends(get_db)):
         duration = (task.end_time - task.start_time).total_seconds() / 60
         task.duration = round(duration, 2)
     
+    rollups.add_task(db, task)
     db.commit()
+    data_version.bump("tasks")
     db.refresh(task)
-    return task.to_dict()
+    result = task.to_dict()
+    events.publish("task.stopped", result)
+    return result
 
 
-@router.get("/stats/summary")
-def get_stats_summary(db: Session = Depends(get_db)):
-    """Get statistics summary"""
-    today = datetime.utcnow().date()
-    
-    # Today's tasks
-    today_tasks = db.query(Task).filter(Task.start_time >= today).all()
-    total_time_today = sum(task.duration for task in today_tasks)
-    
-    # All time stats
-    all_tasks = db.query(Task).all()
-    total_tasks = len(all_tasks)
-    total_time_all = sum(task.duration for task in all_tasks)
+def get_totals(db: Session) -> dict:
+    """Today's and all time task counts and tracked minutes, from the daily rollups"""
+    is_today = DailyRollup.day == datetime.utcnow().date().isoformat()
+    total_tasks, total_time_all, today_count, total_time_today = db.query(
+        func.coalesce(func.sum(DailyRollup.tasks_count), 0),
+        func.coalesce(func.sum(DailyRollup.total_time), 0.0),
+        func.coalesce(func.sum(case((is_today, DailyRollup.tasks_count))), 0),
+        func.coalesce(func.sum(case((is_today, DailyRollup.total_time))), 0.0),
+    ).one()
     
     return {
         "today": {
-            "tasks_count": len(today_tasks),
+            "tasks_count": today_count,
             "total_time": round(total_time_today, 2),
         },
         "all_time": {
             "tasks_count": total_tasks,
             "total_time": round(total_time_all, 2),
-        }
+        },
     }
 
+
+@router.get("/stats/summary", dependencies=[conditional_get("tasks", daily=True)])
+def get_stats_summary(days: int = 30, db: Session = Depends(get_db)):
+    """Get statistics summary with breakdowns by day, week, category and status"""
+    today = datetime.utcnow().date()
+    since = (today - timedelta(days=max(days - 1, 0))).isoformat()
+    
+    # Grouped breakdowns, read from the daily rollups rather than every task
+    count = func.sum(DailyRollup.tasks_count)
+    total_time = func.coalesce(func.sum(DailyRollup.total_time), 0.0)
+    week = func.strftime("%Y-W%W", DailyRollup.day)
+    category = func.nullif(DailyRollup.category, "")
+    by_day = db.query(DailyRollup.day, count, total_time) \
+        .filter(DailyRollup.day >= since).group_by(DailyRollup.day).order_by(DailyRollup.day).all()
+    by_week = db.query(week, count, total_time) \
+        .filter(DailyRollup.day >= since).group_by(week).order_by(week).all()
+    by_category = db.query(category, count, total_time).group_by(category).all()
+    by_status = db.query(DailyRollup.status, count, total_time).group_by(DailyRollup.status).all()
+    by_tag = db.query(TagRollup.tag, TagRollup.tasks_count, TagRollup.total_time).order_by(TagRollup.tag).all()
+    
+    def breakdown(rows, key_name):
+        return [
+            {key_name: key, "tasks_count": count, "total_time": round(total_time, 2)}
+            for key, count, total_time in rows
+        ]
+    
+    return {
+        **get_totals(db),
+        "by_day": breakdown(by_day, "date"),
+        "by_week": breakdown(by_week, "week"),
+        "by_category": breakdown(by_category, "category"),
+        "by_status": breakdown(by_status, "status"),
+        "by_tag": breakdown(by_tag, "tag"),
+    }
@@ -0,0 +1,123 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import AsyncIterator, List, Optional
+
+import database
+from database import get_async_db
+from routes import tasks
+from routes.tasks import TaskCreate, TaskUpdate, TaskResponse, TaskSearchResult
+from utils.data_version import conditional_get, data_version
+from utils.events import events
+
+# Async variants of the /tasks routes, served instead of routes.tasks when
+# TRAK_ASYNC_DB is enabled. Route logic is shared with the sync module: each
+# handler runs it on the async session's connection via run_sync(), so the
+# request never occupies a threadpool worker while waiting on SQLite.
+router = APIRouter(prefix="/tasks", tags=["tasks"])
+
+
+@router.post("/", response_model=TaskResponse)
+async def create_task(task: TaskCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new task"""
+    return await db.run_sync(lambda session: tasks.create_task(task, db=session))
+
+
+@router.post("/bulk")
+async def bulk_import_tasks(
+    request: Request,
+    preserve_timestamps: bool = False,
+    chunk_size: int = 1000,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Import many tasks in one transaction (see routes.tasks.bulk_import_tasks)"""
+    chunks, errors = await tasks.read_bulk_items(request, preserve_timestamps, chunk_size)
+    result = await db.run_sync(tasks.import_task_chunks, chunks)
+    data_version.bump("tasks")
+    events.publish("tasks.imported", {"imported": result["imported"]})
+    return {**result, "failed": len(errors), "errors": errors}
+
+
+@router.get("/", response_model=List[TaskResponse], dependencies=[conditional_get("tasks")])
+async def get_tasks(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[str] = None,
+    after: Optional[str] = None,
+    tag: Optional[List[str]] = Query(None),
+    tag_match: str = "any",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all tasks with optional tag filtering and keyset pagination"""
+    return await db.run_sync(
+        lambda session: tasks.get_tasks(response, skip, limit, status, after, tag, tag_match, db=session)
+    )
+
+
+@router.get("/today", response_model=List[TaskResponse], dependencies=[conditional_get("tasks", daily=True)])
+async def get_today_tasks(response: Response, db: AsyncSession = Depends(get_async_db)):
+    """Get today's tasks"""
+    return await db.run_sync(lambda session: tasks.get_today_tasks(response, db=session))
+
+
+@router.get("/search", response_model=List[TaskSearchResult], dependencies=[conditional_get("tasks")])
+async def search_tasks(q: str, skip: int = 0, limit: int = 20, db: AsyncSession = Depends(get_async_db)):
+    """Full-text search over titles, descriptions and tags, best matches first"""
+    return await db.run_sync(lambda session: tasks.search_tasks(q, skip, limit, db=session))
+
+
+async def aiter_export_rows(
+    format: str,
+    start: Optional[date],
+    end: Optional[date],
+) -> AsyncIterator[str]:
+    """Stream tasks in batches from a server-side cursor as NDJSON or CSV text"""
+    async with database.AsyncSessionLocal() as db:
+        if format == "csv":
+            yield tasks.format_export_batch([], format, header=True)
+        result = await db.stream_scalars(tasks.build_export_query(start, end))
+        async for batch in result.partitions():
+            yield tasks.format_export_batch(batch, format)
+
+
+@router.get("/export")
+async def export_tasks(
+    format: str = "ndjson",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    """Stream the full task history as NDJSON or CSV, optionally between two dates (inclusive)"""
+    if format not in tasks.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Format must be 'ndjson' or 'csv'")
+    return tasks.export_streaming_response(format, aiter_export_rows(format, start, end))
+
+
+@router.get("/{task_id}", response_model=TaskResponse, dependencies=[conditional_get("tasks")])
+async def get_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get a specific task"""
+    return await db.run_sync(lambda session: tasks.get_task(task_id, db=session))
+
+
+@router.put("/{task_id}", response_model=TaskResponse)
+async def update_task(task_id: int, task_update: TaskUpdate, db: AsyncSession = Depends(get_async_db)):
+    """Update a task"""
+    return await db.run_sync(lambda session: tasks.update_task(task_id, task_update, db=session))
+
+
+@router.delete("/{task_id}")
+async def delete_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete a task"""
+    return await db.run_sync(lambda session: tasks.delete_task(task_id, db=session))
+
+
+@router.post("/{task_id}/stop")
+async def stop_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Stop a running task"""
+    return await db.run_sync(lambda session: tasks.stop_task(task_id, db=session))
+
+
+@router.get("/stats/summary", dependencies=[conditional_get("tasks", daily=True)])
+async def get_stats_summary(days: int = 30, db: AsyncSession = Depends(get_async_db)):
+    """Get statistics summary with breakdowns by day, week, category and status"""
+    return await db.run_sync(lambda session: tasks.get_stats_summary(days, db=session))
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# Point the app at a throwaway database before any test module imports `database`
+TEST_DIR = tempfile.mkdtemp(prefix="trak-test-")
+os.environ["TRAK_DATABASE_PATH"] = os.path.join(TEST_DIR, "trak.db")
+os.environ["TRAK_PERSIST_SESSIONS"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
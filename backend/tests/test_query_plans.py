@@ -0,0 +1,85 @@
+"""Check that the task listing, tag filter and search routes read through an index.
+
+Calls the routes against a temp database, captures the SELECTs they run and
+asserts EXPLAIN QUERY PLAN never reports a full scan of tasks or task_tags.
+"""
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import database
+import main
+
+# "SCAN tasks" on SQLite >= 3.36, "SCAN TABLE tasks" before; a covering index adds "USING ..."
+FULL_SCAN_RE = re.compile(r"^SCAN (TABLE )?(tasks|task_tags)\b(?!.*\bUSING\b)")
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        now = datetime.utcnow()
+        rows = [
+            {
+                "title": f"Task {i}",
+                "category": "Work",
+                "start_time": (now - timedelta(hours=i)).isoformat(),
+                "end_time": (now - timedelta(hours=i) + timedelta(minutes=30)).isoformat(),
+                "status": "completed" if i % 2 else "in_progress",
+                "tags": ["focus", "deep-work"] if i % 3 else ["email"],
+            }
+            for i in range(50)
+        ]
+        response = client.post("/tasks/bulk?preserve_timestamps=true", json=rows)
+        assert response.status_code == 200, response.text
+        yield client
+
+
+def task_queries(client, path):
+    """The SELECTs on tasks that a GET of `path` runs, with their parameters"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and re.search(r"\btasks\b", statement):
+            statements.append((statement, parameters))
+
+    event.listen(database.engine, "before_cursor_execute", capture)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(database.engine, "before_cursor_execute", capture)
+    assert response.status_code == 200, response.text
+    assert statements, f"{path} ran no queries on tasks"
+    return statements
+
+
+def full_scans(statement, parameters):
+    """Plan steps that read every row of tasks or task_tags instead of going through an index"""
+    with database.engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [detail for *_, detail in plan if FULL_SCAN_RE.match(detail)]
+
+
+@pytest.mark.parametrize("path", [
+    "/tasks/",
+    "/tasks/?limit=10",
+    "/tasks/today",
+    "/tasks/?status=completed",
+    "/tasks/?status=in_progress&limit=5",
+    "/tasks/?tag=focus",
+    "/tasks/?tag=focus&tag=email",
+    "/tasks/?tag=focus&tag=deep-work&tag_match=all",
+    "/tasks/search?q=task",
+    "/tasks/search?q=task%202",
+])
+def test_task_routes_use_an_index(client, path):
+    for statement, parameters in task_queries(client, path):
+        assert not full_scans(statement, parameters), statement
+
+
+def test_cursor_page_uses_an_index(client):
+    cursor = client.get("/tasks/?limit=10").headers["X-Next-Cursor"]
+    for statement, parameters in task_queries(client, f"/tasks/?limit=10&after={cursor}"):
+        assert not full_scans(statement, parameters), statement
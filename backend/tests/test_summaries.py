@@ -0,0 +1,97 @@
+"""Check the chunked /ai/generate-summary path against a stubbed Ollama client."""
+import pytest
+from fastapi.testclient import TestClient
+
+import database
+import main
+from models import Session as WorkSession
+from routes import ai
+
+
+def make_tasks(day: str, titles):
+    return [
+        {"title": title, "category": "Work", "start_time": f"{day}T09:00:00", "duration": 30.0}
+        for title in titles
+    ]
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def stub_ollama(monkeypatch):
+    """Replace the Ollama calls; tests set `answers["chunk"]` to control chunk summaries"""
+    answers = {"chunk": "Worked on things.", "calls": 0}
+
+    async def is_available(url=None):
+        return True
+
+    async def generate_task_summary(tasks, model=None, url=None):
+        answers["calls"] += 1
+        return answers["chunk"]
+
+    async def summarize_summaries(parts, model=None, url=None):
+        return " ".join(summary for _, summary in parts)
+
+    monkeypatch.setattr(ai.ollama, "is_available", is_available)
+    monkeypatch.setattr(ai.ollama, "generate_task_summary", generate_task_summary)
+    monkeypatch.setattr(ai.ollama, "summarize_summaries", summarize_summaries)
+    with database.SessionLocal() as db:
+        db.query(WorkSession).delete()
+        db.commit()
+    return answers
+
+
+def cached_keys():
+    with database.SessionLocal() as db:
+        return [key for (key,) in db.query(WorkSession.summary_key)]
+
+
+def test_empty_chunk_summary_is_a_failure(client, stub_ollama):
+    stub_ollama["chunk"] = ""
+    tasks = make_tasks("2024-01-01", ["Write report"]) + make_tasks("2024-01-02", ["Review PR"])
+
+    response = client.post("/ai/generate-summary", json={"tasks": tasks, "chunk_by": "day"})
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Failed to generate summary"}
+    assert cached_keys() == []
+
+
+def test_unchanged_chunks_are_reused(client, stub_ollama):
+    tasks = make_tasks("2024-01-01", ["Write report"]) + make_tasks("2024-01-02", ["Review PR"])
+
+    first = client.post("/ai/generate-summary", json={"tasks": tasks, "chunk_by": "day"})
+    tasks[-1]["title"] = "Review two PRs"
+    second = client.post("/ai/generate-summary", json={"tasks": tasks, "chunk_by": "day"})
+
+    assert first.json()["chunks_generated"] == 2
+    assert second.status_code == 200
+    assert second.json()["chunks_generated"] == 1
+    assert len(cached_keys()) == 2
+
+
+def test_category_chunks_of_different_periods_are_kept(client, stub_ollama):
+    week1 = make_tasks("2024-01-01", ["Write report"])
+    week2 = make_tasks("2024-01-08", ["Plan sprint"])
+
+    client.post("/ai/generate-summary", json={"tasks": week1, "chunk_by": "category"})
+    client.post("/ai/generate-summary", json={"tasks": week2, "chunk_by": "category"})
+    again = client.post("/ai/generate-summary", json={"tasks": week1, "chunk_by": "category"})
+
+    assert again.json()["chunks_generated"] == 0
+    assert len(cached_keys()) == 2
+
+
+def test_models_keep_separate_day_chunks(client, stub_ollama):
+    tasks = make_tasks("2024-01-01", ["Write report"])
+
+    client.post("/ai/generate-summary", json={"tasks": tasks, "chunk_by": "day", "model": "model-a"})
+    client.post("/ai/generate-summary", json={"tasks": tasks, "chunk_by": "day", "model": "model-b"})
+    again = client.post("/ai/generate-summary", json={"tasks": tasks, "chunk_by": "day", "model": "model-a"})
+
+    assert again.json()["chunks_generated"] == 0
+    assert len(cached_keys()) == 2
@@ -0,0 +1,142 @@
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Task
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens, dropping single characters"""
+    return [token for token in TOKEN_RE.findall(text.lower()) if len(token) > 1]
+
+
+class CategoryClassifier:
+    """Multinomial naive Bayes over task title + description.
+
+    Trained from the categories users have set on existing tasks. A full fit
+    of the table runs on a background thread (first on the initial sync, then
+    every `refit_interval` seconds to pick up edited categories) and is
+    swapped in when done; sync() itself only learns tasks created since the
+    last one (an id range scan). predict() is a few dictionary lookups and
+    answers nothing until `min_samples` tasks across `min_categories`
+    categories are known and the text shares `min_tokens` tokens with them.
+    """
+
+    def __init__(
+        self,
+        categories: Iterable[str],
+        min_samples: int = 30,
+        min_categories: int = 2,
+        min_tokens: int = 2,
+        refit_interval: float = 60 * 60,
+    ):
+        self.categories = list(categories)
+        self.min_samples = min_samples
+        self.min_categories = min_categories
+        self.min_tokens = min_tokens
+        self.refit_interval = refit_interval
+        self._lock = threading.Lock()
+        self._refitting = False
+        self._reset()
+
+    def _reset(self):
+        self.token_counts: Dict[str, Counter] = defaultdict(Counter)
+        self.token_totals: Counter = Counter()
+        self.doc_counts: Counter = Counter()
+        self.vocabulary = set()
+        self.last_task_id = 0
+        self.fitted_at: Optional[float] = None
+
+    @property
+    def samples(self) -> int:
+        return sum(self.doc_counts.values())
+
+    def learn(self, text: str, category: str):
+        """Add one labelled example"""
+        if category not in self.categories:
+            return
+        tokens = tokenize(text)
+        self.doc_counts[category] += 1
+        self.token_counts[category].update(tokens)
+        self.token_totals[category] += len(tokens)
+        self.vocabulary.update(tokens)
+
+    def _learn_new_tasks(self, db: Session):
+        """Learn the categorized tasks with ids above last_task_id"""
+        rows = db.execute(
+            select(Task.id, Task.title, Task.description, Task.category)
+            .where(Task.id > self.last_task_id, Task.category.in_(self.categories))
+            .order_by(Task.id)
+            .execution_options(yield_per=1000)
+        )
+        for task_id, title, description, category in rows:
+            self.learn(f"{title} {description or ''}", category)
+            self.last_task_id = task_id
+
+    def _refit(self):
+        """Fit a fresh model on the whole table, then swap it in"""
+        fresh = CategoryClassifier(self.categories)
+        started = time.monotonic()
+        db = SessionLocal()
+        try:
+            fresh._learn_new_tasks(db)
+        except Exception as e:
+            print(f"[Classifier] Refit failed: {type(e).__name__} - {str(e)}")
+            fresh = None
+        finally:
+            db.close()
+        
+        with self._lock:
+            self._refitting = False
+            if fresh is not None:
+                self.token_counts = fresh.token_counts
+                self.token_totals = fresh.token_totals
+                self.doc_counts = fresh.doc_counts
+                self.vocabulary = fresh.vocabulary
+                self.last_task_id = fresh.last_task_id
+                self.fitted_at = started
+
+    def sync(self, db: Session):
+        """Learn categories of tasks added since the last sync, starting a full refit when due"""
+        with self._lock:
+            due = self.fitted_at is None or time.monotonic() - self.fitted_at > self.refit_interval
+            if due and not self._refitting:
+                self._refitting = True
+                threading.Thread(target=self._refit, daemon=True).start()
+            if self.fitted_at is not None:
+                self._learn_new_tasks(db)
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """Return the most likely category and its posterior probability"""
+        with self._lock:
+            samples = self.samples
+            trained = sum(1 for category in self.categories if self.doc_counts[category])
+            tokens = [token for token in tokenize(text) if token in self.vocabulary]
+            if samples < self.min_samples or trained < self.min_categories or len(tokens) < self.min_tokens:
+                return None, 0.0
+            
+            vocabulary_size = len(self.vocabulary)
+            scores = {}
+            for category in self.categories:
+                # Laplace-smoothed prior, so categories without examples still compete
+                counts = self.token_counts[category]
+                denominator = self.token_totals[category] + vocabulary_size
+                score = math.log((self.doc_counts[category] + 1) / (samples + len(self.categories)))
+                for token in tokens:
+                    score += math.log((counts[token] + 1) / denominator)
+                scores[category] = score
+        
+        best = max(scores, key=scores.get)
+        # Normalise log scores into a posterior with a stable softmax
+        top = scores[best]
+        total = sum(math.exp(score - top) for score in scores.values())
+        return best, 1.0 / total
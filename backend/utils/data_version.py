@@ -0,0 +1,50 @@
+import secrets
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+from fastapi import Depends, HTTPException, Request, Response
+
+
+class DataVersion:
+    """Per-scope write counters that read endpoints turn into ETags.
+    
+    Counters live in memory, so ETags carry a per-process id and never match
+    across restarts.
+    """
+    
+    def __init__(self):
+        self._process = secrets.token_hex(4)
+        self._versions = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def bump(self, scope: str):
+        """Record a committed write to `scope`"""
+        with self._lock:
+            self._versions[scope] += 1
+    
+    def etag(self, *scopes: str, daily: bool = False) -> str:
+        """Weak ETag for the current version of `scopes` (and today's date for daily views)"""
+        tag = ".".join([self._process] + [f"{scope}.{self._versions[scope]}" for scope in scopes])
+        if daily:
+            tag += f".{datetime.utcnow().date().isoformat()}"
+        return f'W/"{tag}"'
+
+
+data_version = DataVersion()
+
+
+def conditional_get(*scopes: str, daily: bool = False):
+    """Dependency answering If-None-Match with 304 before the route touches the database.
+    
+    The check only reads in-memory counters, so it is async to run on the event
+    loop rather than costing a threadpool hop on every conditional GET.
+    """
+    async def check(request: Request, response: Response):
+        etag = data_version.etag(*scopes, daily=daily)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+            raise HTTPException(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+    return Depends(check)
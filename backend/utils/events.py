@@ -0,0 +1,89 @@
+import asyncio
+import threading
+from collections import deque
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+HISTORY_SIZE = 1000  # events kept for clients resuming after a reconnect
+QUEUE_SIZE = 1000  # events buffered per subscriber before it is dropped
+
+
+class Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.overflowed = False
+    
+    def deliver(self, event: Tuple[int, str, Dict]):
+        """Runs on the subscriber's event loop"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too far behind to catch up; it will be told to refetch instead
+            self.overflowed = True
+
+
+class EventBus:
+    """In-process pub/sub of numbered change events with a short replay history.
+    
+    publish() may be called from any thread (sync routes run in the
+    threadpool); each subscriber receives events on its own event loop.
+    """
+    
+    def __init__(self, history_size: int = HISTORY_SIZE):
+        self._seq = 0
+        self._history: deque = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+    
+    @property
+    def seq(self) -> int:
+        return self._seq
+    
+    def publish(self, event_type: str, data: Dict) -> int:
+        """Number an event, remember it and hand it to every subscriber"""
+        with self._lock:
+            self._seq += 1
+            event = (self._seq, event_type, data)
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.loop.call_soon_threadsafe(subscriber.deliver, event)
+        return event[0]
+    
+    async def subscribe(self, after: Optional[int] = None, keepalive: float = 15.0) -> AsyncIterator[Optional[Tuple[int, str, Dict]]]:
+        """Yield events after sequence number `after` (or from now), then live ones.
+        
+        Yields a ("reset") event when the missed events are no longer in the
+        history, and None every `keepalive` seconds while idle.
+        """
+        subscriber = Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscriber)
+            seq = self._seq
+            if after is None or after == seq:
+                backlog = []
+            elif after > seq or not self._history or after < self._history[0][0] - 1:
+                # From before a restart, or older than the history: the client must refetch
+                backlog = [(seq, "reset", {})]
+            else:
+                backlog = [event for event in self._history if event[0] > after]
+        
+        try:
+            for event in backlog:
+                yield event
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if subscriber.overflowed:
+                    yield (self._seq, "reset", {})
+                    return
+                yield event
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+
+events = EventBus()
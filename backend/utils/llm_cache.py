@@ -0,0 +1,114 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class LLMCache:
+    """Persistent cache of LLM responses, content-addressed by
+    (kind, model, prompt template version, normalized input, options).
+
+    Entries live in their own SQLite file and are evicted least recently used
+    beyond `max_entries` and after `ttl` seconds. Lookups are a single
+    primary-key read, so a hit returns in well under a millisecond; an
+    entry's last_used is only rewritten once it is `touch_interval` seconds
+    old, so repeated hits do not each commit a write.
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000, ttl: float = 30 * 24 * 60 * 60, touch_interval: float = 5 * 60):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used ON llm_cache (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize user input so trivially different spellings share an entry"""
+        return " ".join(text.lower().split())
+
+    def key(self, kind: str, version: int, model: str, text: str, options: Optional[Dict] = None) -> str:
+        """Build the content address of a generation"""
+        payload = json.dumps(
+            [kind, version, model, self.normalize(text), options or {}],
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str, count_miss: bool = True) -> Optional[str]:
+        """Return a cached response, or None on a miss or expired entry.
+        
+        Pass count_miss=False for a lookup that will be followed by a normal
+        get() on a miss, so the miss is not counted twice.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, last_used FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                if count_miss:
+                    self.misses += 1
+                return None
+            
+            if now - row[2] > self.touch_interval:
+                # LRU order only needs to be approximate, so refresh it at most every touch_interval
+                self._conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str):
+        """Store a response, evicting the least recently used entries over the cap"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._conn.execute(
+                """DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Drop every cached response and reset the counters"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
@@ -1,57 +1,345 @@
-import requests
-from typing import Optional, List, Dict
-
-
-def check_ollama_available(url: str = "http://localhost:11434") -> bool:
-    """Check if Ollama is running and available"""
+import asyncio
+import json
+import time
+import httpx
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.llm_cache import LLMCache
+
+DEFAULT_MODEL = "mistral:7b-instruct-q4_0"
+DEFAULT_URL = "http://localhost:11434"
+VALID_CATEGORIES = ["Work", "Personal", "Learning", "Meeting", "Break", "Other"]
+
+# Bump a version whenever its prompt template changes, so cached responses are not reused
+PROMPT_VERSIONS = {"title": 1, "description": 1, "category": 1}
+TITLE_OPTIONS = {"temperature": 0.3, "top_p": 0.9, "max_tokens": 50}
+DESCRIPTION_OPTIONS = {"temperature": 0.5, "top_p": 0.9, "max_tokens": 100}
+CATEGORY_OPTIONS = {"temperature": 0.3}
+CACHE_OPTIONS = {"title": TITLE_OPTIONS, "description": DESCRIPTION_OPTIONS, "category": CATEGORY_OPTIONS}
+
+# Failures where the request never reached the model, so retrying cannot run a generation twice
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+RETRY_STATUSES = {502, 503}
+
+
+def category_text(task_title: str, task_description: Optional[str]) -> str:
+    """The input a category suggestion is cached under"""
+    return f"{task_title}\n{task_description or ''}"
+
+
+async def coalesce_tokens(chunks: AsyncIterator[Dict], min_chars: int = 32, max_delay: float = 0.05) -> AsyncIterator[Tuple[str, Optional[Dict]]]:
+    """Merge streamed generation chunks into fewer, larger pieces of text.
+
+    Yields (text, None) once `min_chars` characters have accumulated or the
+    oldest buffered token is `max_delay` seconds old, and finally
+    ("", final_chunk) for the done chunk. The upstream stream is read by a
+    separate task, so the delay bound holds even while no tokens arrive, and
+    that task (with its HTTP request) is cancelled as soon as this generator
+    is closed or cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def pump():
+        try:
+            async for chunk in chunks:
+                queue.put_nowait(chunk)
+                if chunk.get("done", False):
+                    break
+        except Exception as e:
+            queue.put_nowait(e)
+        finally:
+            queue.put_nowait(None)
+    
+    producer = asyncio.create_task(pump())
     try:
-        response = requests.get(f"{url}/api/tags", timeout=5)
-        if response.status_code == 200:
-            print(f"[Ollama] Successfully connected to {url}")
-            return True
-        else:
+        buffer = ""
+        deadline = 0.0
+        while True:
+            try:
+                timeout = max(deadline - loop.time(), 0) if buffer else None
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                yield buffer, None
+                buffer = ""
+                continue
+            
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            
+            token = item.get("response", "")
+            if token:
+                if not buffer:
+                    deadline = loop.time() + max_delay
+                buffer += token
+            
+            if item.get("done", False):
+                if buffer:
+                    yield buffer, None
+                yield "", item
+                break
+            if len(buffer) >= min_chars:
+                yield buffer, None
+                buffer = ""
+    finally:
+        producer.cancel()
+
+
+@dataclass
+class OllamaHealth:
+    """Cached availability of one Ollama URL"""
+    available: bool = False
+    models: List[Dict] = field(default_factory=list)
+    checked_at: float = 0.0
+    failures: int = 0
+    open_until: float = 0.0  # circuit breaker: skip probing until this time
+
+
+class OllamaClient:
+    """Async Ollama API client sharing one keep-alive connection pool per process.
+
+    Every method takes the Ollama URL per call, since it is a user setting;
+    httpx pools connections per host, so calls to the same URL reuse them.
+    Requests are retried with exponential backoff on connection errors and
+    502/503 responses only; a read timeout means Ollama may still be working
+    on the generation, so it is never resubmitted.
+
+    Availability is cached per URL from a single /api/tags fetch that also
+    provides the model list. Fresh entries are served as-is, stale healthy
+    entries are served while a background refresh runs, and after
+    `failure_threshold` consecutive failures the circuit opens and the URL is
+    reported unavailable without probing for `open_timeout` seconds.
+
+    With a `cache`, title, description and category generations are served
+    from the persistent LLM response cache when the same input recurs.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        retries: int = 2,
+        backoff: float = 0.5,
+        max_connections: int = 10,
+        health_ttl: float = 10.0,
+        failure_threshold: int = 3,
+        open_timeout: float = 30.0,
+        cache: Optional[LLMCache] = None,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.health_ttl = health_ttl
+        self.failure_threshold = failure_threshold
+        self.open_timeout = open_timeout
+        self.cache = cache
+        self._health: Dict[str, OllamaHealth] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    async def aclose(self):
+        """Close the underlying connection pool"""
+        await self._client.aclose()
+
+    async def _request(self, method: str, url: str, timeout: Optional[float] = None, retries: Optional[int] = None, **kwargs) -> httpx.Response:
+        """Send a request, retrying connection errors and 502/503 responses with backoff"""
+        retries = self.retries if retries is None else retries
+        for attempt in range(retries + 1):
+            try:
+                response = await self._client.request(method, url, timeout=timeout or self.timeout, **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    return response
+                print(f"[Ollama] HTTP {response.status_code} from {url}, retrying")
+            except CONNECT_ERRORS as e:
+                if attempt == retries:
+                    raise
+                print(f"[Ollama] {type(e).__name__} calling {url}, retrying")
+            await asyncio.sleep(self.backoff * (2 ** attempt))
+
+    async def _tags(self, url: str) -> Optional[Dict]:
+        """Fetch /api/tags, returning None if Ollama is unreachable"""
+        try:
+            response = await self._request("GET", f"{url}/api/tags", timeout=5, retries=0)
+            if response.status_code == 200:
+                return response.json()
             print(f"[Ollama] Connection failed: HTTP {response.status_code} from {url}")
-            return False
-    except requests.exceptions.ConnectionError as e:
-        print(f"[Ollama] Connection error to {url}: {str(e)}")
-        return False
-    except requests.exceptions.Timeout as e:
-        print(f"[Ollama] Timeout connecting to {url} (timeout: 5s)")
-        return False
-    except requests.exceptions.RequestException as e:
-        print(f"[Ollama] Request error to {url}: {str(e)}")
-        return False
-    except Exception as e:
-        print(f"[Ollama] Unexpected error checking {url}: {type(e).__name__} - {str(e)}")
-        return False
-
-
-def get_ollama_models(url: str = "http://localhost:11434") -> List[Dict]:
-    """Get list of available Ollama models"""
-    try:
-        response = requests.get(f"{url}/api/tags", timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            models = data.get("models", [])
-            print(f"[Ollama] Found {len(models)} model(s) at {url}")
-            return models
-        else:
-            print(f"[Ollama] Failed to get models: HTTP {response.status_code} from {url}")
-            return []
-    except requests.exceptions.RequestException as e:
-        print(f"[Ollama] Error getting models from {url}: {str(e)}")
-        return []
-    except Exception as e:
-        print(f"[Ollama] Unexpected error getting models from {url}: {type(e).__name__} - {str(e)}")
-        return []
-
-
-def generate_task_title(task_description: str, model: str = "mistral:7b-instruct-q4_0", url: str = "http://localhost:11434") -> Optional[str]:
-    """Generate a task title from description using Ollama"""
-    if not task_description:
-        return None
-    
-    prompt = f"""You are a task title generator. Create a clear, professional task title.
+            return None
+        except httpx.ConnectError as e:
+            print(f"[Ollama] Connection error to {url}: {str(e)}")
+            return None
+        except httpx.TimeoutException:
+            print(f"[Ollama] Timeout connecting to {url} (timeout: 5s)")
+            return None
+        except httpx.HTTPError as e:
+            print(f"[Ollama] Request error to {url}: {str(e)}")
+            return None
+        except Exception as e:
+            print(f"[Ollama] Unexpected error checking {url}: {type(e).__name__} - {str(e)}")
+            return None
+
+    def _record_failure(self, url: str):
+        """Mark a URL unavailable, opening the circuit after repeated failures"""
+        health = self._health.setdefault(url, OllamaHealth())
+        health.available = False
+        health.checked_at = time.monotonic()
+        health.failures += 1
+        if health.failures >= self.failure_threshold:
+            health.open_until = health.checked_at + self.open_timeout
+            print(f"[Ollama] {health.failures} consecutive failures at {url}, pausing checks for {self.open_timeout:.0f}s")
+
+    async def _refresh_health(self, url: str) -> OllamaHealth:
+        """Fetch /api/tags once and update the cached health of a URL"""
+        data = await self._tags(url)
+        if data is None:
+            self._record_failure(url)
+            return self._health[url]
+        
+        models = data.get("models", [])
+        print(f"[Ollama] Successfully connected to {url}, found {len(models)} model(s)")
+        health = OllamaHealth(available=True, models=models, checked_at=time.monotonic())
+        self._health[url] = health
+        return health
+
+    def _start_refresh(self, url: str) -> asyncio.Task:
+        """Start a health refresh, sharing one in-flight fetch per URL"""
+        task = self._refreshing.get(url)
+        if task is None or task.done():
+            task = asyncio.create_task(self._refresh_health(url))
+            self._refreshing[url] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(url, None))
+        return task
+
+    async def get_health(self, url: str = DEFAULT_URL, force: bool = False) -> OllamaHealth:
+        """Get the cached health of an Ollama URL, refreshing it when needed"""
+        health = self._health.get(url)
+        now = time.monotonic()
+        
+        if health is not None and not force:
+            if health.open_until > now:
+                return health
+            if now - health.checked_at < self.health_ttl:
+                return health
+            if health.available:
+                # Serve the stale result and revalidate in the background
+                self._start_refresh(url)
+                return health
+        
+        return await asyncio.shield(self._start_refresh(url))
+
+    async def is_available(self, url: str = DEFAULT_URL) -> bool:
+        """Check if Ollama is running and available"""
+        return (await self.get_health(url)).available
+
+    async def list_models(self, url: str = DEFAULT_URL) -> List[Dict]:
+        """Get list of available Ollama models"""
+        return (await self.get_health(url)).models
+
+    async def generate(self, prompt: str, model: str = DEFAULT_MODEL, url: str = DEFAULT_URL, options: Optional[Dict] = None, timeout: Optional[float] = None) -> Optional[str]:
+        """Run a non-streaming generation and return the raw response text"""
+        try:
+            response = await self._request(
+                "POST",
+                f"{url}/api/generate",
+                timeout=timeout,
+                json={
+                    "model": model,
+                    "prompt": prompt,
+                    "stream": False,
+                    "options": options or {},
+                },
+            )
+            if response.status_code == 200:
+                return response.json().get("response", "").strip()
+            return None
+        except CONNECT_ERRORS as e:
+            # Only an unreachable server counts against its health; a slow generation does not
+            print(f"[Ollama] Generation failed at {url}: {type(e).__name__} - {str(e)}")
+            self._record_failure(url)
+            return None
+        except Exception as e:
+            print(f"[Ollama] Generation failed at {url}: {type(e).__name__} - {str(e)}")
+            return None
+
+    async def stream_generate(self, prompt: str, model: str = DEFAULT_MODEL, url: str = DEFAULT_URL, options: Optional[Dict] = None, timeout: Optional[float] = None, context: Optional[List[int]] = None) -> AsyncIterator[Dict]:
+        """Run a streaming generation, yielding each decoded JSON chunk.
+
+        Pass the `context` tokens from a previous final chunk to continue that
+        conversation without reprocessing it. Raises httpx.HTTPStatusError if
+        Ollama answers with a non-200 status.
+        """
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True,
+            "options": options or {},
+        }
+        if context:
+            payload["context"] = context
+        async with self._client.stream(
+            "POST",
+            f"{url}/api/generate",
+            timeout=timeout or self.timeout,
+            json=payload,
+        ) as response:
+            if response.status_code != 200:
+                raise httpx.HTTPStatusError(
+                    f"Failed to get AI response: {response.status_code}",
+                    request=response.request,
+                    response=response,
+                )
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def lookup(self, kind: str, model: str, text: str) -> Optional[str]:
+        """A cached title, description or category generation, without calling Ollama.
+        
+        Lets routes answer cache hits before checking that Ollama is available.
+        """
+        if self.cache is None:
+            return None
+        key = self.cache.key(kind, PROMPT_VERSIONS[kind], model, text, CACHE_OPTIONS[kind])
+        return self.cache.get(key, count_miss=False)
+
+    async def _cached(self, kind: str, model: str, text: str, produce: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        """Serve a generation from the response cache, producing and storing it on a miss"""
+        if self.cache is None:
+            return await produce()
+        
+        key = self.cache.key(kind, PROMPT_VERSIONS[kind], model, text, CACHE_OPTIONS[kind])
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        result = await produce()
+        if result:
+            self.cache.set(key, result)
+        return result
+
+    async def generate_task_title(self, task_description: str, model: str = DEFAULT_MODEL, url: str = DEFAULT_URL) -> Optional[str]:
+        """Generate a task title from description using Ollama"""
+        if not task_description:
+            return None
+        return await self._cached(
+            "title", model, task_description,
+            lambda: self._generate_task_title(task_description, model, url),
+        )
+
+    async def _generate_task_title(self, task_description: str, model: str, url: str) -> Optional[str]:
+        
+        prompt = f"""You are a task title generator. Create a clear, professional task title.
 
 User input: "{task_description}"
 
@@ -74,81 +362,66 @@ Now generate a title for: "{task_description}"
 
 Return ONLY the title, no explanations or quotes."""
 
-    try:
-        response = requests.post(
-            f"{url}/api/generate",
-            json={
-                "model": model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.3,
-                    "top_p": 0.9,
-                    "max_tokens": 50,
-                }
-            },
-            timeout=30
-        )
+        title = await self.generate(prompt, model, url, TITLE_OPTIONS)
+        if title is None:
+            return None
+        # Clean up any quotes or extra formatting
+        title = title.replace('"', '').replace("'", '').strip()
+        # Remove "Title:" or "Output:" prefixes if present
+        if ':' in title:
+            title = title.split(':', 1)[1].strip()
+        return title
+
+    async def generate_task_summary(self, tasks: List[Dict], model: str = DEFAULT_MODEL, url: str = DEFAULT_URL) -> Optional[str]:
+        """Generate a summary of tasks using Ollama"""
+        if not tasks:
+            return None
         
-        if response.status_code == 200:
-            result = response.json()
-            title = result.get("response", "").strip()
-            # Clean up any quotes or extra formatting
-            title = title.replace('"', '').replace("'", '').strip()
-            # Remove "Title:" or "Output:" prefixes if present
-            if ':' in title:
-                title = title.split(':', 1)[1].strip()
-            return title
-        return None
-    except:
-        return None
-
-
-def generate_task_summary(tasks: List[Dict], model: str = "mistral:7b-instruct-q4_0", url: str = "http://localhost:11434") -> Optional[str]:
-    """Generate a summary of tasks using Ollama"""
-    if not tasks:
-        return None
-    
-    tasks_text = "\n".join([
-        f"- {task.get('title', 'Untitled')} ({task.get('duration', 0):.1f} min)"
-        for task in tasks
-    ])
-    
-    prompt = f"""Summarize this work session in 2-3 sentences:
+        tasks_text = "\n".join([
+            f"- {task.get('title', 'Untitled')} ({task.get('duration', 0):.1f} min)"
+            for task in tasks
+        ])
+        
+        prompt = f"""Summarize this work session in 2-3 sentences:
 
 Tasks completed:
 {tasks_text}
 
 Provide a brief, professional summary of what was accomplished."""
 
-    try:
-        response = requests.post(
-            f"{url}/api/generate",
-            json={
-                "model": model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                }
-            },
-            timeout=30
+        return await self.generate(prompt, model, url, {
+            "temperature": 0.7,
+        })
+
+    async def summarize_summaries(self, parts: List[Tuple[str, str]], model: str = DEFAULT_MODEL, url: str = DEFAULT_URL) -> Optional[str]:
+        """Combine (label, summary) pairs for parts of a work period into one summary"""
+        if not parts:
+            return None
+        
+        parts_text = "\n".join(f"- {label}: {summary}" for label, summary in parts)
+        
+        prompt = f"""Combine these summaries of parts of a work period into one summary of 2-3 sentences:
+
+{parts_text}
+
+Provide a brief, professional summary of what was accomplished overall."""
+
+        return await self.generate(prompt, model, url, {
+            "temperature": 0.7,
+        })
+
+    async def generate_enhanced_description(self, user_input: str, model: str = DEFAULT_MODEL, url: str = DEFAULT_URL) -> Optional[str]:
+        """Generate an enhanced, detailed description from user input"""
+        if not user_input:
+            return None
+        return await self._cached(
+            "description", model, user_input,
+            lambda: self._generate_enhanced_description(user_input, model, url),
         )
+
+    async def _generate_enhanced_description(self, user_input: str, model: str, url: str) -> Optional[str]:
         
-        if response.status_code == 200:
-            result = response.json()
-            return result.get("response", "").strip()
-        return None
-    except:
-        return None
-
-
-def generate_enhanced_description(user_input: str, model: str = "mistral:7b-instruct-q4_0", url: str = "http://localhost:11434") -> Optional[str]:
-    """Generate an enhanced, detailed description from user input"""
-    if not user_input:
-        return None
-    
-    prompt = f"""You are a task description enhancer. Create a clear, professional task description.
+        prompt = f"""You are a task description enhancer. Create a clear, professional task description.
 
 User input: "{user_input}"
 
@@ -172,69 +445,36 @@ Now generate a description for: "{user_input}"
 
 Return ONLY the description, no explanations or quotes."""
 
-    try:
-        response = requests.post(
-            f"{url}/api/generate",
-            json={
-                "model": model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.5,
-                    "top_p": 0.9,
-                    "max_tokens": 100,
-                }
-            },
-            timeout=30
+        description = await self.generate(prompt, model, url, DESCRIPTION_OPTIONS)
+        if description is None:
+            return None
+        # Clean up any quotes or extra formatting
+        description = description.replace('"', '').replace("'", '').strip()
+        # Remove "Description:" or "Output:" prefixes if present
+        if ':' in description and len(description.split(':', 1)[0]) < 20:
+            description = description.split(':', 1)[1].strip()
+        return description
+
+    async def generate_category_suggestion(self, task_title: str, task_description: str, model: str = DEFAULT_MODEL, url: str = DEFAULT_URL) -> Optional[str]:
+        """Suggest a category for a task using Ollama"""
+        return await self._cached(
+            "category", model, category_text(task_title, task_description),
+            lambda: self._generate_category_suggestion(task_title, task_description, model, url),
         )
-        
-        if response.status_code == 200:
-            result = response.json()
-            description = result.get("response", "").strip()
-            # Clean up any quotes or extra formatting
-            description = description.replace('"', '').replace("'", '').strip()
-            # Remove "Description:" or "Output:" prefixes if present
-            if ':' in description and len(description.split(':', 1)[0]) < 20:
-                description = description.split(':', 1)[1].strip()
-            return description
-        return None
-    except:
-        return None
-
-
-def generate_category_suggestion(task_title: str, task_description: str, model: str = "mistral:7b-instruct-q4_0", url: str = "http://localhost:11434") -> Optional[str]:
-    """Suggest a category for a task using Ollama"""
-    prompt = f"""Based on this task, suggest ONE category from: Work, Personal, Learning, Meeting, Break, Other
+
+    async def _generate_category_suggestion(self, task_title: str, task_description: str, model: str, url: str) -> Optional[str]:
+        prompt = f"""Based on this task, suggest ONE category from: Work, Personal, Learning, Meeting, Break, Other
 
 Task: {task_title}
 Description: {task_description or 'N/A'}
 
 Return ONLY the category name, nothing else."""
 
-    try:
-        response = requests.post(
-            f"{url}/api/generate",
-            json={
-                "model": model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.3,
-                }
-            },
-            timeout=20
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            category = result.get("response", "").strip()
-            # Validate category
-            valid_categories = ["Work", "Personal", "Learning", "Meeting", "Break", "Other"]
-            for valid in valid_categories:
-                if valid.lower() in category.lower():
-                    return valid
-            return "Other"
-        return None
-    except:
-        return None
-
+        category = await self.generate(prompt, model, url, CATEGORY_OPTIONS, timeout=20)
+        if category is None:
+            return None
+        # Validate category
+        for valid in VALID_CATEGORIES:
+            if valid.lower() in category.lower():
+                return valid
+        return "Other"
@@ -0,0 +1,113 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple, Union
+
+from sqlalchemy import and_, delete, text
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from models import DailyRollup, TagRollup, Task
+
+RollupKey = Tuple[str, str, str]
+
+
+def rollup_key(start_time: datetime, category: str, status: str) -> RollupKey:
+    """The (day, category, status) rollup row a task counts towards"""
+    return start_time.date().isoformat(), category or "", status or ""
+
+
+def apply_deltas(db: Session, deltas: Dict[RollupKey, Tuple[int, float]]):
+    """Add (tasks_count, total_time) deltas to rollup rows, dropping rows that reach zero tasks"""
+    for (day, category, status), (count, minutes) in deltas.items():
+        stmt = insert(DailyRollup).values(
+            day=day, category=category, status=status, tasks_count=count, total_time=minutes,
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["day", "category", "status"],
+            set_={
+                "tasks_count": DailyRollup.tasks_count + stmt.excluded.tasks_count,
+                "total_time": DailyRollup.total_time + stmt.excluded.total_time,
+            },
+        ))
+        if count < 0:
+            db.execute(delete(DailyRollup).where(and_(
+                DailyRollup.day == day,
+                DailyRollup.category == category,
+                DailyRollup.status == status,
+                DailyRollup.tasks_count <= 0,
+            )))
+
+
+def normalize_tags(tags: Union[List[str], str, None]) -> List[str]:
+    """Trim and de-duplicate tags given as a list or a comma-separated string.
+    
+    The one place tags are normalized, so task_tags rows, the tasks.tags
+    column and the tag rollups always agree.
+    """
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return [tag for tag in dict.fromkeys(tag.strip() for tag in tags or []) if tag]
+
+
+def apply_tag_deltas(db: Session, deltas: Dict[str, Tuple[int, float]]):
+    """Add (tasks_count, total_time) deltas to tag rollup rows, dropping rows that reach zero tasks"""
+    for tag, (count, minutes) in deltas.items():
+        stmt = insert(TagRollup).values(tag=tag, tasks_count=count, total_time=minutes)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["tag"],
+            set_={
+                "tasks_count": TagRollup.tasks_count + stmt.excluded.tasks_count,
+                "total_time": TagRollup.total_time + stmt.excluded.total_time,
+            },
+        ))
+        if count < 0:
+            db.execute(delete(TagRollup).where(and_(TagRollup.tag == tag, TagRollup.tasks_count <= 0)))
+
+
+def add_task(db: Session, task: Task):
+    """Count a new (or just updated) task in its rollup rows"""
+    key = rollup_key(task.start_time, task.category, task.status)
+    minutes = task.duration or 0.0
+    apply_deltas(db, {key: (1, minutes)})
+    apply_tag_deltas(db, {tag: (1, minutes) for tag in normalize_tags(task.tags)})
+
+
+def remove_task(db: Session, task: Task):
+    """Take a task out of its rollup rows, before it is deleted or changed"""
+    key = rollup_key(task.start_time, task.category, task.status)
+    minutes = task.duration or 0.0
+    apply_deltas(db, {key: (-1, -minutes)})
+    apply_tag_deltas(db, {tag: (-1, -minutes) for tag in normalize_tags(task.tags)})
+
+
+def add_rows(db: Session, rows: Iterable[dict]):
+    """Count bulk-inserted task rows, one upsert per rollup row touched"""
+    deltas = defaultdict(lambda: (0, 0.0))
+    tag_deltas = defaultdict(lambda: (0, 0.0))
+    for row in rows:
+        key = rollup_key(row["start_time"], row.get("category"), row.get("status"))
+        minutes = row.get("duration") or 0.0
+        count, total = deltas[key]
+        deltas[key] = (count + 1, total + minutes)
+        for tag in normalize_tags(row.get("tags")):
+            count, total = tag_deltas[tag]
+            tag_deltas[tag] = (count + 1, total + minutes)
+    apply_deltas(db, deltas)
+    apply_tag_deltas(db, tag_deltas)
+
+
+def rebuild_rollups(db: Session):
+    """Recompute every daily and tag rollup row from the tasks table"""
+    db.execute(delete(DailyRollup))
+    db.execute(text(
+        "INSERT INTO daily_rollups (day, category, status, tasks_count, total_time) "
+        "SELECT date(start_time), coalesce(category, ''), coalesce(status, ''), count(id), coalesce(sum(duration), 0.0) "
+        "FROM tasks GROUP BY 1, 2, 3"
+    ))
+    db.execute(delete(TagRollup))
+    db.execute(text(
+        "INSERT INTO tag_rollups (tag, tasks_count, total_time) "
+        "SELECT task_tags.tag, count(tasks.id), coalesce(sum(tasks.duration), 0.0) "
+        "FROM task_tags JOIN tasks ON tasks.id = task_tags.task_id GROUP BY 1"
+    ))
+    db.commit()
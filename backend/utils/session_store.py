@@ -0,0 +1,115 @@
+import hashlib
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class SessionStore:
+    """Login sessions mapping tokens to user ids, expiring after `ttl` seconds.
+
+    Sessions are held in memory in creation order, capped at `max_sessions`
+    (the oldest are dropped first). Expired sessions are swept on access at
+    most every `sweep_interval` seconds. With a `path`, sessions are also
+    written to their own SQLite file, keyed by a hash of the token, and
+    reloaded on start so a restart does not log everyone out.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 30 * 24 * 60 * 60,
+                 max_sessions: int = 10000, sweep_interval: float = 60):
+        self.path = path
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.sweep_interval = sweep_interval
+        self._sessions: OrderedDict = OrderedDict()  # token hash -> (user_id, expires_at)
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS sessions (
+                    token_hash TEXT PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT token_hash, user_id, expires_at FROM sessions ORDER BY expires_at DESC LIMIT ?",
+                (max_sessions,),
+            ).fetchall()
+            for token_hash, user_id, expires_at in reversed(rows):
+                self._sessions[token_hash] = (user_id, expires_at)
+
+    @staticmethod
+    def _hash(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _sweep(self, now: float):
+        """Drop expired sessions; caller holds the lock"""
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.sweep_interval
+        # Fixed TTLs make creation order expiry order, so expired ones are at the front
+        while self._sessions:
+            token_hash, (_, expires_at) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            del self._sessions[token_hash]
+        if self._conn is not None:
+            self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+            self._conn.commit()
+
+    def create(self, user_id: int) -> str:
+        """Start a session for a user and return its token"""
+        token = secrets.token_urlsafe(32)
+        token_hash = self._hash(token)
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._sweep(now)
+            self._sessions[token_hash] = (user_id, expires_at)
+            evicted = []
+            while len(self._sessions) > self.max_sessions:
+                evicted.append(self._sessions.popitem(last=False)[0])
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sessions (token_hash, user_id, expires_at) VALUES (?, ?, ?)",
+                    (token_hash, user_id, expires_at),
+                )
+                self._conn.executemany("DELETE FROM sessions WHERE token_hash = ?", [(h,) for h in evicted])
+                self._conn.commit()
+        return token
+
+    def get(self, token: Optional[str]) -> Optional[int]:
+        """Return the user id of a live session, or None"""
+        if not token:
+            return None
+        now = time.time()
+        with self._lock:
+            self._sweep(now)
+            session = self._sessions.get(self._hash(token))
+        if session is None or session[1] <= now:
+            return None
+        return session[0]
+
+    def delete(self, token: Optional[str]) -> bool:
+        """End a session, returning whether it existed"""
+        if not token:
+            return False
+        token_hash = self._hash(token)
+        with self._lock:
+            existed = self._sessions.pop(token_hash, None) is not None
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM sessions WHERE token_hash = ?", (token_hash,))
+                self._conn.commit()
+        return existed
+
+    def __len__(self) -> int:
+        return len(self._sessions)
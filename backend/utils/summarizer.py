@@ -0,0 +1,74 @@
+import asyncio
+import hashlib
+import json
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from utils.ollama_client import OllamaClient
+
+CHUNK_MODES = ("day", "category")
+CHUNK_THRESHOLD = 40  # summaries over more tasks than this are chunked by day
+CHUNK_SIZE = 40  # larger chunks are split into parts of this many tasks
+REDUCE_FANOUT = 20  # chunk summaries combined per reduce prompt
+MAX_CONCURRENCY = 4  # chunk summaries generated at once
+
+
+def chunk_tasks(tasks: List[Dict], chunk_by: str) -> Dict[str, List[Dict]]:
+    """Group tasks by day (from start_time) or category, splitting oversized groups"""
+    groups: Dict[str, List[Dict]] = defaultdict(list)
+    for task in tasks:
+        if chunk_by == "day":
+            label = (task.get("start_time") or "")[:10] or "Undated"
+        else:
+            label = task.get("category") or "Uncategorized"
+        groups[label].append(task)
+    
+    chunks = {}
+    for label in sorted(groups):
+        group = groups[label]
+        if len(group) <= CHUNK_SIZE:
+            chunks[label] = group
+            continue
+        for part, offset in enumerate(range(0, len(group), CHUNK_SIZE), start=1):
+            chunks[f"{label} (part {part})"] = group[offset:offset + CHUNK_SIZE]
+    return chunks
+
+
+def chunk_key(chunk_by: str, label: str, model: str, tasks: List[Dict]) -> str:
+    """Content address of a chunk summary: changes whenever any of its tasks does.
+    
+    The "{chunk_by}:{model}:{label}:" prefix names the chunk itself, so each
+    model keeps its own cached summaries.
+    """
+    content = json.dumps(
+        [model, [(t.get("title"), t.get("description"), round(t.get("duration") or 0, 1)) for t in tasks]],
+        sort_keys=True,
+    )
+    return f"{chunk_by}:{model}:{label}:{hashlib.sha256(content.encode()).hexdigest()[:16]}"
+
+
+async def summarize_chunks(ollama: OllamaClient, chunks: Dict[str, List[Dict]], model: str, url: str) -> Dict[str, Optional[str]]:
+    """Summarize chunks concurrently, at most MAX_CONCURRENCY at a time"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    
+    async def summarize(tasks: List[Dict]) -> Optional[str]:
+        async with semaphore:
+            return await ollama.generate_task_summary(tasks, model, url)
+    
+    labels = list(chunks)
+    summaries = await asyncio.gather(*(summarize(chunks[label]) for label in labels))
+    return dict(zip(labels, summaries))
+
+
+async def reduce_summaries(ollama: OllamaClient, parts: List[Tuple[str, str]], model: str, url: str) -> Optional[str]:
+    """Combine chunk summaries into one, in rounds of REDUCE_FANOUT for long periods"""
+    while len(parts) > 1:
+        groups = [parts[i:i + REDUCE_FANOUT] for i in range(0, len(parts), REDUCE_FANOUT)]
+        combined = await asyncio.gather(*(ollama.summarize_summaries(group, model, url) for group in groups))
+        if not all(combined):
+            return None
+        parts = [
+            (f"{group[0][0]} to {group[-1][0]}", summary)
+            for group, summary in zip(groups, combined)
+        ]
+    return parts[0][1] if parts else None
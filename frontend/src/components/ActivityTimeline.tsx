@@ -124,6 +124,8 @@ export default function ActivityTimeline() {
             title: t.title,
             description: t.description,
             duration: t.duration || 0,
+            start_time: t.start_time,
+            category: t.category,
           })),
           model: settings.ollama_model,
           url: settings.ollama_url,
@@ -30,16 +30,15 @@ export default function ChatAssistant({ isOpen, onClose }: ChatAssistantProps) {
   ]);
   const [input, setInput] = useState("");
   const [isLoading, setIsLoading] = useState(false);
+  const [conversationId, setConversationId] = useState<string | null>(null);
   const scrollRef = useRef<HTMLDivElement>(null);
-  const { tasks, stats, settings, fetchSettings, fetchStats, fetchTodayTasks } = useStore();
+  const { settings, fetchSettings } = useStore();
   const { toast } = useToast();
 
-  // Load settings and data when component mounts
+  // Load settings when component mounts (task stats are gathered by the backend)
   useEffect(() => {
     fetchSettings();
-    fetchStats();
-    fetchTodayTasks();
-  }, [fetchSettings, fetchStats, fetchTodayTasks]);
+  }, [fetchSettings]);
 
   useEffect(() => {
     if (scrollRef.current) {
@@ -47,24 +46,6 @@ export default function ChatAssistant({ isOpen, onClose }: ChatAssistantProps) {
     }
   }, [messages]);
 
-  const buildContext = () => {
-    const completedTasks = tasks.filter(t => t.end_time);
-    return {
-      today_stats: {
-        tasks_count: stats?.today?.tasks_count || 0,
-        total_time: Math.round((stats?.today?.total_time || 0) / 60),
-      },
-      alltime_stats: {
-        tasks_count: stats?.allTime?.tasks_count || 0,
-        total_time: Math.round((stats?.allTime?.total_time || 0) / 60),
-      },
-      recent_tasks: completedTasks.slice(-5).map(t => 
-        `"${t.title}" (${t.duration ? Math.round(t.duration / 60) : 0} min)`
-      ),
-      current_task: useStore.getState().currentTask?.title || "None",
-    };
-  };
-
   const handleSend = async () => {
     if (!input.trim() || isLoading) return;
 
@@ -89,14 +70,15 @@ export default function ChatAssistant({ isOpen, onClose }: ChatAssistantProps) {
     setIsLoading(true);
 
     try {
-      const context = buildContext();
-
       const response = await fetch(`${API_URL}/ai/chat`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
           message: userMessage.content,
-          context: context,
+          context: {
+            current_task: useStore.getState().currentTask?.title,
+          },
+          conversation_id: conversationId,
           model: settings.ollama_model || "mistral:7b-instruct-q4_0",
           url: settings.ollama_url || "http://localhost:11434",
         }),
@@ -140,6 +122,10 @@ export default function ChatAssistant({ isOpen, onClose }: ChatAssistantProps) {
             try {
               const parsed = JSON.parse(data);
               
+              if (parsed.conversation_id) {
+                setConversationId(parsed.conversation_id);
+              }
+              
               if (parsed.token) {
                 fullContent += parsed.token;
                 // Update message content in real-time
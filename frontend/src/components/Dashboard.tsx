@@ -19,8 +19,6 @@ export default function Dashboard() {
     elapsedSeconds,
     stats,
     tasks,
-    fetchStats,
-    fetchTodayTasks,
     stopTask,
     createTask,
     pauseTimer,
@@ -43,12 +41,6 @@ export default function Dashboard() {
     return () => clearInterval(interval);
   }, [isTimerRunning, isPaused, updateElapsedSeconds]);
 
-  // Load initial data
-  useEffect(() => {
-    fetchStats();
-    fetchTodayTasks();
-  }, [fetchStats, fetchTodayTasks]);
-
   // Calculate breaks from tasks
   const breaks = tasks.filter((t) => t.title.toLowerCase().includes("break")).length;
 
@@ -62,6 +62,7 @@ const Settings = () => {
     try {
       const url = new URL(`${API_URL}/ai/status`);
       url.searchParams.set('url', ollamaUrl);
+      url.searchParams.set('refresh', 'true');
       
       const response = await fetch(url.toString());
       if (!response.ok) {
@@ -133,9 +134,13 @@ const Settings = () => {
   const handleExportData = async () => {
     setIsExporting(true);
     try {
-      // Fetch all tasks
-      const tasksResponse = await fetch(`${API_URL}/tasks/`);
-      const tasks = await tasksResponse.json();
+      // Fetch the full task history (streamed as NDJSON)
+      const tasksResponse = await fetch(`${API_URL}/tasks/export?format=ndjson`);
+      const tasksText = await tasksResponse.text();
+      const tasks = tasksText
+        .split("\n")
+        .filter((line) => line.trim())
+        .map((line) => JSON.parse(line));
 
       // Fetch all settings
       const settingsResponse = await fetch(`${API_URL}/settings/`);
@@ -191,24 +196,17 @@ const Settings = () => {
         throw new Error("Invalid data format");
       }
 
-      // Import tasks
-      let importedCount = 0;
-      for (const task of importData.tasks) {
-        try {
-          await fetch(`${API_URL}/tasks/`, {
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({
-              title: task.title,
-              description: task.description,
-              category: task.category,
-              tags: task.tags || [],
-            }),
-          });
-          importedCount++;
-        } catch (error) {
-          console.error("Failed to import task:", error);
-        }
+      // Import tasks in a single bulk request, keeping their original timestamps
+      const response = await fetch(`${API_URL}/tasks/bulk?preserve_timestamps=true`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(importData.tasks),
+      });
+      if (!response.ok) throw new Error("Bulk import failed");
+      const result = await response.json();
+      const importedCount = result.imported;
+      if (result.failed > 0) {
+        console.error("Failed to import tasks:", result.errors);
       }
 
       toast({
@@ -72,18 +72,11 @@ export default function TaskEditModal({ open, onClose, onSave, task }: TaskEditM
 
     setIsProcessing(true);
     try {
-      const settingsResponse = await fetch(`${API_URL}/settings/`);
-      const settings = await settingsResponse.json();
-      const model = settings.ollama_model || "mistral:7b-instruct-q4_0";
-      const url = settings.ollama_url || "http://localhost:11434";
-
       const titleResponse = await fetch(`${API_URL}/ai/generate-title`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
           description: description,
-          model: model,
-          url: url,
         }),
       });
 
@@ -63,20 +63,12 @@ export default function TaskEntryModal({ open, onClose, onStart }: TaskEntryModa
       // Process AI asynchronously (non-blocking)
       setTimeout(async () => {
         try {
-          // Get settings for model and URL
-          const settingsResponse = await fetch(`${API_URL}/settings/`);
-          const settings = await settingsResponse.json();
-          const model = settings.ollama_model || "mistral:7b-instruct-q4_0";
-          const url = settings.ollama_url || "http://localhost:11434";
-
           // Generate title using AI
           const titleResponse = await fetch(`${API_URL}/ai/generate-title`, {
             method: "POST",
             headers: { "Content-Type": "application/json" },
             body: JSON.stringify({
               description: userInput,
-              model: model,
-              url: url,
             }),
           });
 
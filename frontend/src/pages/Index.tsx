@@ -19,6 +19,7 @@ import Settings from "@/components/Settings";
 import TitleBar from "@/components/TitleBar";
 import ChatAssistant from "@/components/ChatAssistant";
 import { useAuth } from "@/contexts/AuthContext";
+import { useStore } from "@/store/useStore";
 
 type TabType = "today" | "timeline" | "analytics" | "settings";
 
@@ -33,6 +34,12 @@ const Index = () => {
     await logout();
   };
 
+  // Load the initial state, then keep tasks and stats in sync with backend changes
+  useEffect(() => {
+    useStore.getState().bootstrap();
+    return useStore.getState().subscribeToEvents();
+  }, []);
+
   // Initialize theme from system preference
   useEffect(() => {
     const systemTheme = window.matchMedia("(prefers-color-scheme: dark)").matches
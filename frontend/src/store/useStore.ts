@@ -38,6 +38,14 @@ export interface Settings {
   close_to_tray: boolean;
 }
 
+// Convert string "true"/"false" settings to booleans, with defaults
+const parseSettings = (settingsData: Record<string, string | null>): Settings => ({
+  use_ai: settingsData.use_ai === "true",
+  ollama_model: settingsData.ollama_model || 'mistral:7b-instruct-q4_0',
+  ollama_url: settingsData.ollama_url || 'http://localhost:11434',
+  close_to_tray: settingsData.close_to_tray !== "false", // Default to true
+});
+
 interface StoreState {
   // Tasks
   tasks: Task[];
@@ -57,6 +65,7 @@ interface StoreState {
   isLoading: boolean;
   
   // Actions
+  bootstrap: () => Promise<void>;
   fetchTasks: () => Promise<void>;
   fetchTodayTasks: () => Promise<void>;
   fetchStats: () => Promise<void>;
@@ -66,6 +75,7 @@ interface StoreState {
   deleteTask: (id: number) => Promise<void>;
   stopTask: (id: number) => Promise<void>;
   updateSettings: (key: string, value: any) => Promise<void>;
+  subscribeToEvents: () => () => void;
   
   // Timer actions
   startTimer: () => void;
@@ -96,6 +106,22 @@ export const useStore = create<StoreState>((set, get) => ({
   },
   isLoading: false,
 
+  // Load today's tasks, stats and settings in one request
+  bootstrap: async () => {
+    try {
+      const response = await fetch(`${API_URL}/bootstrap`);
+      if (!response.ok) throw new Error('Failed to bootstrap');
+      const data = await response.json();
+      set({
+        tasks: data.today,
+        stats: data.stats,
+        settings: parseSettings(data.settings),
+      });
+    } catch (error) {
+      console.error('Failed to bootstrap:', error);
+    }
+  },
+
   // Fetch all tasks
   fetchTasks: async () => {
     try {
@@ -138,16 +164,7 @@ export const useStore = create<StoreState>((set, get) => ({
       const response = await fetch(`${API_URL}/settings/`);
       if (!response.ok) throw new Error('Failed to fetch settings');
       const settingsData = await response.json();
-      
-      // Convert string "true"/"false" to boolean for use_ai and close_to_tray
-      const settings: Settings = {
-        use_ai: settingsData.use_ai === "true",
-        ollama_model: settingsData.ollama_model || 'mistral:7b-instruct-q4_0',
-        ollama_url: settingsData.ollama_url || 'http://localhost:11434',
-        close_to_tray: settingsData.close_to_tray !== "false", // Default to true
-      };
-      
-      set({ settings });
+      set({ settings: parseSettings(settingsData) });
     } catch (error) {
       console.error('Failed to fetch settings:', error);
     }
@@ -178,10 +195,6 @@ export const useStore = create<StoreState>((set, get) => ({
         timerState: { startTime: Date.now(), pausedTime: 0 },
       });
       
-      // Refresh tasks and stats
-      get().fetchTodayTasks();
-      get().fetchStats();
-      
       return task;
     } catch (error) {
       console.error('Failed to create task:', error);
@@ -198,10 +211,6 @@ export const useStore = create<StoreState>((set, get) => ({
         body: JSON.stringify(updates),
       });
       if (!response.ok) throw new Error('Failed to update task');
-      
-      // Refresh tasks and stats
-      get().fetchTodayTasks();
-      get().fetchStats();
     } catch (error) {
       console.error('Failed to update task:', error);
       throw error;
@@ -215,10 +224,6 @@ export const useStore = create<StoreState>((set, get) => ({
         method: 'DELETE',
       });
       if (!response.ok) throw new Error('Failed to delete task');
-      
-      // Refresh tasks and stats
-      get().fetchTodayTasks();
-      get().fetchStats();
     } catch (error) {
       console.error('Failed to delete task:', error);
       throw error;
@@ -241,10 +246,6 @@ export const useStore = create<StoreState>((set, get) => ({
         elapsedSeconds: 0,
         timerState: { startTime: null, pausedTime: 0 },
       });
-      
-      // Refresh tasks and stats
-      get().fetchTodayTasks();
-      get().fetchStats();
     } catch (error) {
       console.error('Failed to stop task:', error);
       throw error;
@@ -273,6 +274,44 @@ export const useStore = create<StoreState>((set, get) => ({
     }
   },
 
+  // Apply task changes pushed by the backend instead of refetching after every mutation.
+  // EventSource reconnects with Last-Event-ID, so missed changes are replayed.
+  subscribeToEvents: () => {
+    const source = new EventSource(`${API_URL}/events/`);
+    
+    const replaceTask = (event: MessageEvent) => {
+      const task: Task = JSON.parse(event.data);
+      set((state) => ({
+        tasks: state.tasks.map((t) => (t.id === task.id ? task : t)),
+      }));
+      get().fetchStats();
+    };
+    const refetch = () => {
+      get().fetchTodayTasks();
+      get().fetchStats();
+    };
+    
+    source.addEventListener('task.created', (event: MessageEvent) => {
+      const task: Task = JSON.parse(event.data);
+      set((state) => ({
+        tasks: [task, ...state.tasks.filter((t) => t.id !== task.id)],
+      }));
+      get().fetchStats();
+    });
+    source.addEventListener('task.updated', replaceTask);
+    source.addEventListener('task.stopped', replaceTask);
+    source.addEventListener('task.deleted', (event: MessageEvent) => {
+      const { id } = JSON.parse(event.data);
+      set((state) => ({ tasks: state.tasks.filter((t) => t.id !== id) }));
+      get().fetchStats();
+    });
+    // Bulk imports, and changes too old to replay, need a full refresh
+    source.addEventListener('tasks.imported', refetch);
+    source.addEventListener('reset', refetch);
+    
+    return () => source.close();
+  },
+
   // Timer actions
   startTimer: () => set({ isTimerRunning: true, isPaused: false, timerState: { startTime: Date.now(), pausedTime: 0 } }),
   stopTimer: () => set({ isTimerRunning: false, isPaused: false, elapsedSeconds: 0, timerState: { startTime: null, pausedTime: 0 } }),